@@ -0,0 +1,114 @@
+"""
+Stockage des fichiers générés par job (maillages, champ de densité)
+Chaque job écrit dans son propre dossier <artifact_id>/ ; un balayage en
+arrière-plan supprime les dossiers expirés (TTL) puis les plus anciens tant que
+la taille totale dépasse la limite
+"""
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+DENSITY_FILE = "density.npy"
+
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ArtifactStore:
+    """
+    Dossiers d'artefacts identifiés par un uuid (partagés entre l'API et les
+    processus de calcul via le système de fichiers)
+    """
+
+    def __init__(self, root: str, ttl_seconds: float, max_bytes: int):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.swept_artifacts = 0
+
+    def create(self) -> str:
+        """Nouveau dossier d'artefacts, retourne son identifiant"""
+        artifact_id = uuid.uuid4().hex
+        (self.root / artifact_id).mkdir(parents=True)
+        return artifact_id
+
+    def path(self, artifact_id: str, filename: str) -> Optional[Path]:
+        """
+        Chemin d'un fichier d'artefact, None si l'identifiant ou le nom est
+        invalide (pas de sortie du dossier du job)
+        """
+        if not _ARTIFACT_ID.match(artifact_id) or Path(filename).name != filename:
+            return None
+        return self.root / artifact_id / filename
+
+    def url(self, artifact_id: str, filename: str) -> str:
+        return f"/api/download/{artifact_id}/{filename}"
+
+    def save_density(self, artifact_id: str, density: np.ndarray) -> Path:
+        path = self.path(artifact_id, DENSITY_FILE)
+        np.save(path, density)
+        return path
+
+    def load_density(self, artifact_id: str) -> Optional[np.ndarray]:
+        """Champ de densité en lecture seule, projeté en mémoire (mmap)"""
+        path = self.path(artifact_id, DENSITY_FILE)
+        if path is None or not path.is_file():
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def sweep(self) -> int:
+        """
+        Supprime les artefacts expirés puis les plus anciens au-delà de max_bytes
+        Retourne le nombre de dossiers supprimés
+        """
+        if not self.root.is_dir():
+            return 0
+        now = time.time()
+        entries = []
+        for path in self.root.iterdir():
+            if not path.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+                entries.append((path.stat().st_mtime, size, path))
+            except OSError:
+                continue  # Supprimé entre-temps
+        entries.sort()
+
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            expired = now - mtime > self.ttl_seconds
+            if not expired and total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        self.swept_artifacts += removed
+        return removed
+
+    async def run_sweeper(self, interval: float):
+        """Boucle de balayage périodique (tâche lancée au démarrage de l'API)"""
+        while True:
+            removed = await asyncio.to_thread(self.sweep)
+            if removed:
+                print(f"🧹 {removed} dossier(s) d'artefacts supprimé(s)")
+            await asyncio.sleep(interval)
+
+
+# Instance partagée (configurée par variables d'environnement)
+artifact_store = ArtifactStore(
+    root=os.getenv(
+        "ARTIFACT_DIR",
+        str(Path(tempfile.gettempdir()) / "topology_optimization" / "artifacts"),
+    ),
+    ttl_seconds=float(os.getenv("ARTIFACT_TTL_HOURS", "24")) * 3600,
+    max_bytes=int(float(os.getenv("ARTIFACT_MAX_MB", "2048")) * 1024 * 1024),
+)
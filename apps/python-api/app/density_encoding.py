@@ -0,0 +1,67 @@
+"""
+Encodage compact du champ de densité dans les réponses de l'API
+- "list": listes JSON imbriquées (format historique)
+- "base64": tableau quantifié (uint8 ou float16), compressé zlib, en base64
+- "link": URL de l'endpoint binaire, le champ n'est pas inclus dans la réponse
+- "none": champ omis
+"""
+import base64
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from app.simp_optimizer import downsample_density
+
+# Échelle de quantification uint8: densité = valeur / 255
+UINT8_SCALE = 255
+
+
+def quantize_density(density: np.ndarray, dtype: str) -> np.ndarray:
+    """Densité [0, 1] en uint8 (256 niveaux), float16 ou float32 little-endian"""
+    if dtype == "uint8":
+        return np.rint(np.clip(density, 0.0, 1.0) * UINT8_SCALE).astype(np.uint8)
+    return np.asarray(density, dtype="<f2" if dtype == "float16" else "<f4")
+
+
+def encode_density(
+    density: np.ndarray,
+    encoding: str = "list",
+    dtype: str = "uint8",
+    downsample: int = 1,
+    url: Optional[str] = None,
+):
+    """
+    Champ de densité pour OptimizationResponse.density_field
+
+    Args:
+        density: grille (nx, ny, nz), éventuellement projetée en mémoire
+        encoding: "list", "base64", "link" ou "none"
+        dtype: quantification pour "base64" / "link" ("uint8" ou "float16")
+        downsample: facteur de réduction (moyenne par blocs), 1 = résolution complète
+        url: endpoint binaire du champ (encodage "link")
+    """
+    if encoding == "none":
+        return None
+    if encoding == "link":
+        shape = [-(-n // downsample) for n in density.shape]
+        return {
+            "encoding": "link",
+            "url": f"{url}?dtype={dtype}&downsample={downsample}",
+            "shape": shape,
+            "dtype": dtype,
+        }
+
+    field = downsample_density(np.asarray(density), downsample)
+    if encoding == "list":
+        return field.tolist()
+
+    values = quantize_density(field, dtype)
+    return {
+        "encoding": "base64+zlib",
+        "dtype": values.dtype.name,
+        "shape": list(values.shape),
+        "order": "C",
+        "scale": 1 / UINT8_SCALE if dtype == "uint8" else 1.0,
+        "data": base64.b64encode(zlib.compress(values.tobytes(), 6)).decode("ascii"),
+    }
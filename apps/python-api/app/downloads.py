@@ -0,0 +1,123 @@
+"""
+Réponses de téléchargement de fichiers générés (STL, GLB, ...)
+Lecture par blocs en streaming, requêtes partielles (Range) pour reprendre un
+téléchargement, compression gzip si le client l'accepte
+"""
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 256 * 1024
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Vrai si l'en-tête Accept-Encoding autorise gzip (q > 0)"""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Plage d'octets (début, fin incluse) d'un en-tête "Range: bytes=a-b"
+    None si absent, non géré (plages multiples) ou invalide (ignoré: réponse
+    complète, RFC 9110); ValueError si valide mais non satisfiable
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start, _, end = range_header[6:].strip().partition("-")
+    if not (start or end) or any(part and not part.isdigit() for part in (start, end)):
+        return None
+    if start:
+        first = int(start)
+        last = int(end) if end else max(first, size - 1)
+        if first > last:
+            return None  # Syntaxiquement invalide (bytes=5-3)
+    else:
+        suffix = int(end)  # Suffixe: n derniers octets
+        if suffix == 0:
+            raise ValueError(f"Plage non satisfiable: {range_header}")
+        first, last = max(size - suffix, 0), size - 1
+    if first >= size:
+        raise ValueError(f"Plage non satisfiable: {range_header}")
+    return first, min(last, size - 1)
+
+
+def _file_chunks(path: Path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _gzip_chunks(path: Path):
+    # Compression au fil de la lecture (jamais le fichier entier en mémoire)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: format gzip
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+    yield compressor.flush()
+
+
+def file_download(
+    path: Path,
+    media_type: str,
+    filename: str,
+    accept_encoding: Optional[str] = None,
+    range_header: Optional[str] = None,
+):
+    """
+    Réponse de téléchargement:
+    - en-tête Range: 206 avec la plage demandée (416 si hors fichier)
+    - gzip en streaming si accepté
+    - sinon FileResponse (envoi par blocs, Content-Length connu)
+    """
+    size = path.stat().st_size
+    disposition = f'attachment; filename="{filename}"'
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if byte_range is not None:
+        first, last = byte_range
+        return StreamingResponse(
+            _file_chunks(path, first, last - first + 1),
+            status_code=206,
+            media_type=media_type,
+            headers={
+                "Content-Range": f"bytes {first}-{last}/{size}",
+                "Content-Length": str(last - first + 1),
+                "Accept-Ranges": "bytes",
+                "Content-Disposition": disposition,
+            },
+        )
+
+    if not accepts_gzip(accept_encoding):
+        return FileResponse(
+            path, media_type=media_type, filename=filename, headers={"Accept-Ranges": "bytes"}
+        )
+    return StreamingResponse(
+        _gzip_chunks(path),
+        media_type=media_type,
+        headers={
+            "Content-Encoding": "gzip",
+            "Content-Disposition": disposition,
+            "Vary": "Accept-Encoding",
+        },
+    )
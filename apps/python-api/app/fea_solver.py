@@ -0,0 +1,671 @@
+"""
+Analyse par éléments finis pour l'optimisation SIMP
+Éléments hexaédriques trilinéaires à 8 nœuds sur grille structurée de voxels
+"""
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, identity, kron
+from scipy.sparse.linalg import splu
+
+
+# Coins de l'hexaèdre de référence (ordre local des 8 nœuds)
+# Chaque coin est donné par son décalage (di, dj, dk) dans la grille
+_HEX8_CORNERS = (
+    (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+    (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1),
+)
+
+# Indices ligne/colonne des 24x24 termes de la matrice élémentaire
+_KE_ROWS = np.repeat(np.arange(24), 24)
+_KE_COLS = np.tile(np.arange(24), 24)
+
+
+@lru_cache(maxsize=8)
+def hex8_stiffness(poisson_ratio: float, element_size: tuple) -> np.ndarray:
+    """
+    Matrice de rigidité élémentaire (24x24) d'un hexaèdre à 8 nœuds
+
+    Calculée pour E=1 par intégration de Gauss 2x2x2: la rigidité réelle
+    d'un élément est E_e * KE (matériau isotrope linéaire).
+
+    Args:
+        poisson_ratio: Coefficient de Poisson nu
+        element_size: (hx, hy, hz) dimensions de l'élément en mm
+    """
+    nu = poisson_ratio
+    hx, hy, hz = element_size
+
+    # Loi de comportement isotrope (E=1)
+    lam = nu / ((1 + nu) * (1 - 2 * nu))
+    mu = 1 / (2 * (1 + nu))
+    D = np.zeros((6, 6))
+    D[:3, :3] = lam
+    D[np.arange(3), np.arange(3)] += 2 * mu
+    D[np.arange(3, 6), np.arange(3, 6)] = mu
+
+    signs = np.array(_HEX8_CORNERS, dtype=float) * 2 - 1  # coordonnées de référence ±1
+    gauss = np.array([-1.0, 1.0]) / np.sqrt(3.0)
+    det_j = hx * hy * hz / 8
+
+    ke = np.zeros((24, 24))
+    for xi in gauss:
+        for eta in gauss:
+            for zeta in gauss:
+                # Dérivées des fonctions de forme dans le repère physique
+                dn = np.empty((8, 3))
+                dn[:, 0] = signs[:, 0] * (1 + signs[:, 1] * eta) * (1 + signs[:, 2] * zeta) / 8 * (2 / hx)
+                dn[:, 1] = signs[:, 1] * (1 + signs[:, 0] * xi) * (1 + signs[:, 2] * zeta) / 8 * (2 / hy)
+                dn[:, 2] = signs[:, 2] * (1 + signs[:, 0] * xi) * (1 + signs[:, 1] * eta) / 8 * (2 / hz)
+
+                # Matrice déformation-déplacement (xx, yy, zz, xy, yz, zx)
+                B = np.zeros((6, 24))
+                B[0, 0::3] = dn[:, 0]
+                B[1, 1::3] = dn[:, 1]
+                B[2, 2::3] = dn[:, 2]
+                B[3, 0::3] = dn[:, 1]
+                B[3, 1::3] = dn[:, 0]
+                B[4, 1::3] = dn[:, 2]
+                B[4, 2::3] = dn[:, 1]
+                B[5, 0::3] = dn[:, 2]
+                B[5, 2::3] = dn[:, 0]
+
+                ke += B.T @ D @ B * det_j
+
+    ke.setflags(write=False)
+    return ke
+
+
+@lru_cache(maxsize=4)
+def element_dofs(shape: tuple) -> np.ndarray:
+    """
+    Table de connectivité (n_elements, 24) des degrés de liberté
+
+    Les éléments sont numérotés dans l'ordre C de la grille de densité
+    (density.ravel()), les nœuds dans l'ordre C de la grille (nx+1, ny+1, nz+1).
+    """
+    nx, ny, nz = shape
+    node_ids = np.arange((nx + 1) * (ny + 1) * (nz + 1), dtype=np.int32)
+    node_ids = node_ids.reshape(nx + 1, ny + 1, nz + 1)
+
+    element_nodes = np.stack(
+        [node_ids[di:di + nx, dj:dj + ny, dk:dk + nz].ravel() for di, dj, dk in _HEX8_CORNERS],
+        axis=1,
+    )
+    edof = (3 * element_nodes[:, :, None] + np.arange(3, dtype=np.int32)).reshape(-1, 24)
+
+    edof.setflags(write=False)
+    return edof
+
+
+def pcg(apply_a, b, apply_m, x0=None, rtol: float = 1e-6, max_iter: int = 2000):
+    """
+    Gradient conjugué préconditionné
+
+    Args:
+        apply_a: Produit matrice-vecteur A @ x (A symétrique définie positive)
+        b: Second membre
+        apply_m: Application du préconditionneur M^-1 @ r
+        x0: Solution initiale (démarrage à chaud), zéro par défaut
+        rtol: Tolérance sur le résidu relatif ||r|| / ||b||
+        max_iter: Nombre maximal d'itérations
+
+    Returns:
+        (x, iterations, résidu relatif final)
+    """
+    b_norm = np.linalg.norm(b)
+    if b_norm == 0:
+        return np.zeros_like(b), 0, 0.0
+
+    x = np.zeros_like(b) if x0 is None else x0.copy()
+    r = b - apply_a(x) if x0 is not None else b.copy()
+    residual = np.linalg.norm(r) / b_norm
+
+    iterations = 0
+    if residual <= rtol:
+        return x, iterations, float(residual)
+
+    z = apply_m(r)
+    p = z.copy()
+    rz = r @ z
+
+    while iterations < max_iter:
+        iterations += 1
+        ap = apply_a(p)
+        alpha = rz / (p @ ap)
+        x += alpha * p
+        r -= alpha * ap
+
+        residual = np.linalg.norm(r) / b_norm
+        if residual <= rtol:
+            break
+
+        z = apply_m(r)
+        rz_new = r @ z
+        p *= rz_new / rz
+        p += z
+        rz = rz_new
+
+    return x, iterations, float(residual)
+
+
+class HexFEModel:
+    """
+    Modèle éléments finis sur la grille de voxels du SIMP
+
+    Regroupe la matrice élémentaire, la connectivité, les degrés de liberté
+    bloqués et le vecteur des forces nodales.
+    """
+
+    def __init__(
+        self,
+        shape: tuple,
+        element_size: tuple,
+        poisson_ratio: float,
+        fixed_faces: list,
+        load_nodes: np.ndarray = None,
+        force_magnitude: float = 0.0,
+        force_direction: np.ndarray = (0, 0, -1),
+    ):
+        """
+        Args:
+            shape: (nx, ny, nz) nombre d'éléments par axe
+            element_size: (hx, hy, hz) taille d'un élément en mm
+            poisson_ratio: Coefficient de Poisson du matériau
+            fixed_faces: Faces encastrées ('bottom', 'top', 'left', 'right')
+            load_nodes: Masque (nx, ny, nz) des éléments chargés (face du dessus),
+                None pour un modèle sans chargement (niveaux multigrilles)
+            force_magnitude: Force totale en N
+            force_direction: Direction de la force
+        """
+        self.shape = tuple(shape)
+        self.element_size = tuple(element_size)
+        self.fixed_faces = tuple(sorted(set(fixed_faces)))
+        self.n_elements = int(np.prod(self.shape))
+        self.n_dofs = 3 * (self.shape[0] + 1) * (self.shape[1] + 1) * (self.shape[2] + 1)
+
+        self.poisson_ratio = float(poisson_ratio)
+        self.ke = hex8_stiffness(self.poisson_ratio, self.element_size)
+
+        self.fixed_dofs = self.fixed_dofs_mask(self.shape, self.fixed_faces)
+        self.free_dofs = ~self.fixed_dofs
+        self.force = self._force_vector(load_nodes, force_magnitude, force_direction)
+
+    @staticmethod
+    def fixed_dofs_mask(shape: tuple, fixed_faces: tuple) -> np.ndarray:
+        """Masque des degrés de liberté encastrés (3 composantes par nœud)"""
+        nx, ny, nz = shape
+        fixed = np.zeros((nx + 1, ny + 1, nz + 1), dtype=bool)
+
+        if 'bottom' in fixed_faces:
+            fixed[:, :, 0] = True
+        if 'top' in fixed_faces:
+            fixed[:, :, -1] = True
+        if 'left' in fixed_faces:
+            fixed[0, :, :] = True
+        if 'right' in fixed_faces:
+            fixed[-1, :, :] = True
+
+        return np.repeat(fixed.ravel(), 3)
+
+    def _force_vector(self, load_nodes, force_magnitude, force_direction) -> np.ndarray:
+        """Répartit la force uniformément sur les nœuds du dessus des éléments chargés"""
+        nx, ny, nz = self.shape
+        if load_nodes is None:
+            return np.zeros(self.n_dofs)
+        top_elements = load_nodes[:, :, -1]
+
+        # Un nœud du dessus est chargé s'il appartient à un élément chargé
+        loaded = np.zeros((nx + 1, ny + 1), dtype=bool)
+        for di in (0, 1):
+            for dj in (0, 1):
+                loaded[di:di + nx, dj:dj + ny] |= top_elements
+
+        node_mask = np.zeros((nx + 1, ny + 1, nz + 1), dtype=bool)
+        node_mask[:, :, -1] = loaded
+        node_mask = node_mask.ravel() & ~self.fixed_dofs[0::3]
+
+        direction = np.asarray(force_direction, dtype=float)
+        norm = np.linalg.norm(direction)
+        if norm > 0:
+            direction = direction / norm
+
+        force = np.zeros(self.n_dofs)
+        n_loaded = np.count_nonzero(node_mask)
+        if n_loaded:
+            nodal_force = force_magnitude * direction / n_loaded
+            force.reshape(-1, 3)[node_mask] = nodal_force
+
+        return force
+
+    def gather(self, u: np.ndarray) -> np.ndarray:
+        """
+        Extrait les déplacements élémentaires (n_elements, 24)
+
+        Équivalent à u[element_dofs(shape)] mais par tranches de la grille
+        nodale: aucune table de connectivité n'est stockée.
+        """
+        nx, ny, nz = self.shape
+        nodes = u.reshape(nx + 1, ny + 1, nz + 1, 3)
+        ue = np.empty((nx, ny, nz, 24))
+        for corner, (di, dj, dk) in enumerate(_HEX8_CORNERS):
+            ue[..., 3 * corner:3 * corner + 3] = nodes[di:di + nx, dj:dj + ny, dk:dk + nz]
+        return ue.reshape(-1, 24)
+
+    def scatter(self, fe: np.ndarray) -> np.ndarray:
+        """Accumule des vecteurs élémentaires (n_elements, 24) sur les nœuds (n_dofs,)"""
+        nx, ny, nz = self.shape
+        fe = fe.reshape(nx, ny, nz, 24)
+        nodes = np.zeros((nx + 1, ny + 1, nz + 1, 3))
+        for corner, (di, dj, dk) in enumerate(_HEX8_CORNERS):
+            nodes[di:di + nx, dj:dj + ny, dk:dk + nz] += fe[..., 3 * corner:3 * corner + 3]
+        return nodes.ravel()
+
+    def element_energy(self, u: np.ndarray) -> np.ndarray:
+        """Énergie élémentaire u_e^T KE u_e (E=1) pour chaque élément"""
+        ue = self.gather(u)
+        return np.einsum('ei,ei->e', ue @ self.ke, ue)
+
+
+class AssemblyPatternCache:
+    """
+    Cache LRU des structures d'assemblage, borné en octets
+
+    Une grille 50³ occupe déjà ~0.4 Go (entry_map: 576 entiers par élément):
+    les entrées les plus anciennes sont évincées au-delà de max_bytes, la
+    dernière structure construite est toujours conservée.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(sum(array.nbytes for array in entry) for entry in self._entries.values())
+
+    def get(self, shape: tuple, fixed_faces: tuple):
+        key = (tuple(shape), tuple(fixed_faces))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        pattern = _assembly_pattern(*key)
+        with self._lock:
+            self._entries[key] = pattern
+            self._entries.move_to_end(key)
+            while len(self._entries) > 1 and self.size_bytes > self.max_bytes:
+                self._entries.popitem(last=False)
+        return pattern
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# Grilles des requêtes et niveaux grossiers du multigrille dans des caches
+# séparés: les niveaux grossiers construits à chaque résolution n'évincent
+# jamais la structure de la grille fine
+fine_patterns = AssemblyPatternCache(int(os.getenv("ASSEMBLY_CACHE_MB", "1024")) * 1024 * 1024)
+coarse_patterns = AssemblyPatternCache(int(os.getenv("ASSEMBLY_COARSE_CACHE_MB", "256")) * 1024 * 1024)
+
+
+def _assembly_pattern(shape: tuple, fixed_faces: tuple):
+    """
+    Structure CSR de la matrice de rigidité réduite aux degrés de liberté libres
+
+    Returns:
+        (indptr, indices, entry_map) où entry_map (n_elements*576,) donne pour
+        chaque terme élémentaire sa position dans data (nnz pour un terme bloqué)
+    """
+    edof = element_dofs(shape)
+    fixed = HexFEModel.fixed_dofs_mask(shape, fixed_faces)
+
+    # Numérotation compacte des degrés de liberté libres (-1 si bloqué)
+    free_index = np.full(fixed.size, -1, dtype=np.int64)
+    n_free = int(np.count_nonzero(~fixed))
+    free_index[~fixed] = np.arange(n_free)
+
+    rows = free_index[edof[:, _KE_ROWS]].ravel()
+    cols = free_index[edof[:, _KE_COLS]].ravel()
+    keep = (rows >= 0) & (cols >= 0)
+    rows, cols = rows[keep], cols[keep]
+
+    # Structure CSR (indices triés) puis position de chaque terme par recherche
+    # dichotomique sur les clés ligne * n_free + colonne
+    pattern = coo_matrix(
+        (np.ones(rows.size, dtype=np.int8), (rows.astype(np.int32), cols.astype(np.int32))),
+        shape=(n_free, n_free),
+    ).tocsr()
+    pattern.sort_indices()
+    indptr = pattern.indptr.astype(np.int64)
+    indices = pattern.indices.astype(np.int32)
+    del pattern
+
+    pattern_keys = np.repeat(np.arange(n_free, dtype=np.int64), np.diff(indptr)) * n_free + indices
+    positions = np.searchsorted(pattern_keys, rows * n_free + cols)
+    del rows, cols, pattern_keys
+
+    entry_map = np.full(keep.size, indices.size, dtype=np.int32)
+    entry_map[keep] = positions
+
+    for array in (indptr, indices, entry_map):
+        array.setflags(write=False)
+    return indptr, indices, entry_map
+
+
+class _FESolverBase:
+    """
+    Résolution K(E_e) u = F par gradient conjugué préconditionné
+
+    Les sous-classes fournissent operator(stiffness) qui retourne le produit
+    matrice-vecteur et la diagonale de K restreints aux degrés de liberté libres.
+    """
+
+    def __init__(
+        self,
+        model: HexFEModel,
+        preconditioner: str = "jacobi",
+        rtol: float = 1e-6,
+        max_iter: int = 2000,
+    ):
+        if preconditioner not in ("jacobi", "multigrid"):
+            raise ValueError(f"Préconditionneur inconnu: {preconditioner}")
+
+        self.model = model
+        self.rtol = rtol
+        self.max_iter = max_iter
+        self._force = model.force[model.free_dofs]
+        self._multigrid = None
+        self.preconditioner = preconditioner
+
+    def operator(self, stiffness: np.ndarray):
+        """Retourne (matvec, diagonale, matrice assemblée ou None) sur les ddl libres"""
+        raise NotImplementedError
+
+    def solve(self, stiffness: np.ndarray, x0: np.ndarray = None):
+        """
+        Résout K(E_e) u = F
+
+        Args:
+            stiffness: Module d'Young de chaque élément (n_elements,)
+            x0: Déplacements initiaux (n_dofs,) pour démarrer à chaud
+
+        Returns:
+            (u sur tous les degrés de liberté, infos du solveur)
+        """
+        matvec, diagonal, _ = self.operator(stiffness)
+
+        if self.preconditioner == "multigrid":
+            # Hiérarchie construite une fois, opérateurs grossiers mis à jour à chaque appel
+            if self._multigrid is None:
+                self._multigrid = MultigridPreconditioner(self)
+            self._multigrid.update(stiffness, matvec, diagonal)
+            apply_m = self._multigrid.apply
+        else:
+            inv_diag = 1.0 / diagonal
+            apply_m = lambda r: inv_diag * r
+
+        u_free, iterations, residual = pcg(
+            matvec,
+            self._force,
+            apply_m,
+            x0=None if x0 is None else x0[self.model.free_dofs],
+            rtol=self.rtol,
+            max_iter=self.max_iter,
+        )
+
+        u = np.zeros(self.model.n_dofs)
+        u[self.model.free_dofs] = u_free
+        return u, {'iterations': iterations, 'residual': residual}
+
+
+class SparseFESolver(_FESolverBase):
+    """
+    Solveur assemblé: matrice de rigidité creuse (scipy.sparse) + PCG
+
+    La structure CSR et la position de chaque terme élémentaire sont
+    précalculées une fois par grille (fine_patterns, ou coarse_patterns pour
+    un niveau grossier du multigrille, partagés entre requêtes); chaque
+    itération SIMP ne fait que réaccumuler les valeurs pondérées par la
+    rigidité des éléments (np.bincount), sans tri ni conversion COO -> CSR.
+    """
+
+    def __init__(self, model: HexFEModel, coarse_level: bool = False, **kwargs):
+        super().__init__(model, **kwargs)
+
+        patterns = coarse_patterns if coarse_level else fine_patterns
+        self._indptr, self._indices, self._entry_map = patterns.get(
+            model.shape, model.fixed_faces
+        )
+        self.n_free = self._indptr.size - 1
+        self._ke_flat = model.ke.ravel()
+
+    def assemble(self, stiffness: np.ndarray) -> csr_matrix:
+        """Assemble K (degrés de liberté libres) pour les rigidités élémentaires données"""
+        values = stiffness[:, None] * self._ke_flat[None, :]
+        data = np.bincount(
+            self._entry_map, weights=values.ravel(), minlength=self._indices.size + 1
+        )[:-1]
+        return csr_matrix(
+            (data, self._indices, self._indptr), shape=(self.n_free, self.n_free)
+        )
+
+    def operator(self, stiffness: np.ndarray):
+        K = self.assemble(stiffness)
+        return K.dot, K.diagonal(), K
+
+
+class MatrixFreeFESolver(_FESolverBase):
+    """
+    Solveur sans matrice (élément par élément) + PCG
+
+    La matrice globale n'est jamais stockée: K @ u est appliqué en extrayant
+    les déplacements élémentaires, en les multipliant par l'unique matrice
+    de référence KE (einsum par lots) pondérée par E_e = f(density ** penal),
+    puis en réaccumulant sur les nœuds. Mémoire en O(n_elements * 24),
+    ce qui permet des grilles 80³-100³ sur un seul nœud CPU.
+    """
+
+    def __init__(self, model: HexFEModel, max_iter: int = 5000, **kwargs):
+        super().__init__(model, max_iter=max_iter, **kwargs)
+        self._ke_diag = np.diag(model.ke).copy()
+
+    def apply(self, stiffness: np.ndarray, u: np.ndarray) -> np.ndarray:
+        """Produit K(E_e) @ u sur tous les degrés de liberté"""
+        ke_u = np.einsum('ej,ij->ei', self.model.gather(u), self.model.ke, optimize=True)
+        ke_u *= stiffness[:, None]
+        return self.model.scatter(ke_u)
+
+    def diagonal(self, stiffness: np.ndarray) -> np.ndarray:
+        """Diagonale de K(E_e) (préconditionneur de Jacobi)"""
+        return self.model.scatter(stiffness[:, None] * self._ke_diag[None, :])
+
+    def operator(self, stiffness: np.ndarray):
+        free = self.model.free_dofs
+        u = np.zeros(self.model.n_dofs)
+
+        def matvec(x):
+            u[free] = x
+            return self.apply(stiffness, u)[free]
+
+        return matvec, self.diagonal(stiffness)[free], None
+
+
+def _interpolation_1d(n_fine: int, n_coarse: int) -> csr_matrix:
+    """
+    Interpolation linéaire des nœuds grossiers vers les nœuds fins sur un axe
+
+    Le nœud grossier c est placé sur le nœud fin min(2c, n_fine): pour un
+    nombre impair d'éléments, le dernier élément grossier ne couvre qu'un
+    élément fin.
+    """
+    rows, cols, vals = [], [], []
+    for f in range(n_fine + 1):
+        if f % 2 == 0:
+            rows.append(f), cols.append(f // 2), vals.append(1.0)
+        elif f == n_fine:
+            rows.append(f), cols.append(n_coarse), vals.append(1.0)
+        else:
+            rows += [f, f]
+            cols += [(f - 1) // 2, (f + 1) // 2]
+            vals += [0.5, 0.5]
+    return coo_matrix((vals, (rows, cols)), shape=(n_fine + 1, n_coarse + 1)).tocsr()
+
+
+def _coarsen_stiffness(stiffness: np.ndarray, shape: tuple) -> np.ndarray:
+    """Moyenne des rigidités élémentaires par blocs 2x2x2 (blocs partiels aux bords impairs)"""
+    field = stiffness.reshape(shape)
+    for axis, n in enumerate(shape):
+        starts = np.arange(0, n, 2)
+        counts = np.minimum(2, n - starts)
+        field = np.add.reduceat(field, starts, axis=axis)
+        field /= counts.reshape([-1 if a == axis else 1 for a in range(3)])
+    return field.ravel()
+
+
+class MultigridPreconditioner:
+    """
+    Préconditionneur multigrille géométrique (V-cycle) sur la grille de voxels
+
+    Chaque niveau grossier divise par deux le nombre d'éléments par axe;
+    l'opérateur grossier est rediscrétisé (rigidités moyennées par blocs
+    2x2x2, même matrice élémentaire à la taille d'élément grossière).
+    Prolongation trilinéaire P, restriction P^T, lissage de Jacobi amorti
+    symétrique (omega = 4 / (3 lambda_max(D^-1 K)), lambda_max estimé par la
+    méthode de la puissance) et factorisation directe au niveau le plus grossier.
+    """
+
+    def __init__(
+        self,
+        solver: _FESolverBase,
+        max_levels: int = 6,
+        coarse_elements: int = 216,
+        assembled_elements: int = 32 ** 3,
+        smoothing_steps: int = 2,
+        power_iterations: int = 8,
+    ):
+        """
+        Args:
+            solver: Solveur du niveau fin
+            max_levels: Nombre maximal de niveaux (niveau fin compris)
+            coarse_elements: Taille sous laquelle on arrête de grossir
+            assembled_elements: Taille sous laquelle un niveau grossier est assemblé
+                (au-dessus, il garde la classe du solveur fin, ex. sans matrice)
+            smoothing_steps: Nombre de pré/post-lissages de Jacobi
+            power_iterations: Itérations de la puissance pour estimer le
+                rayon spectral de D^-1 K (amortissement du lissage)
+        """
+        self.smoothing_steps = smoothing_steps
+        self.power_iterations = power_iterations
+
+        fine = solver.model
+        self.shapes = [fine.shape]
+        self.solvers = [solver]
+        self.prolongations = []
+
+        dimensions = np.array(fine.shape) * np.array(fine.element_size)
+        while len(self.shapes) < max_levels and np.prod(self.shapes[-1]) > coarse_elements:
+            fine_shape = self.shapes[-1]
+            coarse_shape = tuple((n + 1) // 2 for n in fine_shape)
+            if coarse_shape == fine_shape:
+                break
+
+            coarse_model = HexFEModel(
+                coarse_shape,
+                tuple(dimensions / np.array(coarse_shape)),
+                fine.poisson_ratio,
+                fine.fixed_faces,
+            )
+            if np.prod(coarse_shape) > assembled_elements and not isinstance(solver, SparseFESolver):
+                coarse_solver = type(solver)(coarse_model)
+            else:
+                coarse_solver = SparseFESolver(coarse_model, coarse_level=True)
+
+            P = _interpolation_1d(fine_shape[0], coarse_shape[0])
+            for axis in (1, 2):
+                P = kron(P, _interpolation_1d(fine_shape[axis], coarse_shape[axis]), format='csr')
+            P = kron(P, identity(3), format='csr')
+            fine_free = self.solvers[-1].model.free_dofs
+            P = P[fine_free][:, coarse_model.free_dofs].tocsr()
+
+            self.shapes.append(coarse_shape)
+            self.solvers.append(coarse_solver)
+            self.prolongations.append(P)
+
+        self.levels = len(self.shapes)
+        self._operators = []
+        self._coarse_factor = None
+
+    def update(self, stiffness: np.ndarray, matvec, diagonal: np.ndarray):
+        """Met à jour les opérateurs de chaque niveau pour les rigidités courantes"""
+        self._operators = []
+
+        for level in range(self.levels):
+            if level > 0:
+                stiffness = _coarsen_stiffness(stiffness, self.shapes[level - 1])
+                matvec, diagonal, K = self.solvers[level].operator(stiffness)
+
+            # Lissage de Jacobi amorti: omega * D^-1 (inutile au niveau le plus grossier)
+            damped_inv_diag = 1.0 / diagonal
+            if level < self.levels - 1:
+                damped_inv_diag *= 4.0 / (3.0 * self._spectral_radius(matvec, damped_inv_diag))
+            self._operators.append((matvec, damped_inv_diag))
+
+        if self.levels > 1:
+            self._coarse_factor = splu(K.tocsc())
+        else:
+            self._coarse_factor = None
+
+    def _spectral_radius(self, matvec, inv_diag: np.ndarray) -> float:
+        """Estimation (majorée de 10%) de lambda_max(D^-1 K) par la méthode de la puissance"""
+        x = np.random.default_rng(0).standard_normal(inv_diag.size)
+        estimate = 1.0
+        for _ in range(self.power_iterations):
+            y = inv_diag * matvec(x)
+            estimate = np.linalg.norm(y) / np.linalg.norm(x)
+            x = y
+        return 1.1 * estimate
+
+    def apply(self, r: np.ndarray) -> np.ndarray:
+        """Applique un V-cycle: approximation de K^-1 r"""
+        if self._coarse_factor is None:
+            return self._operators[0][1] * r
+        return self._vcycle(0, r)
+
+    def _vcycle(self, level: int, r: np.ndarray) -> np.ndarray:
+        if level == self.levels - 1:
+            return self._coarse_factor.solve(r)
+
+        matvec, damped_inv_diag = self._operators[level]
+
+        # Pré-lissage (démarrage à zéro)
+        x = damped_inv_diag * r
+        for _ in range(self.smoothing_steps - 1):
+            x += damped_inv_diag * (r - matvec(x))
+
+        # Correction sur la grille grossière
+        P = self.prolongations[level]
+        x += P @ self._vcycle(level + 1, P.T @ (r - matvec(x)))
+
+        # Post-lissage (symétrique du pré-lissage)
+        for _ in range(self.smoothing_steps):
+            x += damped_inv_diag * (r - matvec(x))
+
+        return x
+
+
+# Solveurs éléments finis disponibles (le mode "fast" reste l'heuristique du SIMPOptimizer)
+FE_SOLVERS = {
+    'sparse': SparseFESolver,
+    'matrix_free': MatrixFreeFESolver,
+}
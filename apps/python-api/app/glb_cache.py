@@ -0,0 +1,131 @@
+"""
+Cache disque des modèles GLB générés par TripoSR
+Clé = SHA-256 de l'image prétraitée (et des paramètres du modèle); fichiers
+<clé>.glb avec éviction LRU bornée en taille
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+def image_key(image, *params) -> str:
+    """Hash d'une image PIL (mode, taille, pixels) et des paramètres d'inférence"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([image.mode, image.size, *params]).encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class GLBCache:
+    """
+    Fichiers GLB adressés par contenu, avec compteurs de hits et temps
+    d'inférence économisé (mesuré lors de la génération de chaque entrée)
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        # clé -> (taille en octets, durée d'inférence en secondes)
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load_index(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.is_dir():
+            return
+        entries = []
+        for path in self.directory.glob("*.glb"):
+            meta = path.with_suffix(".json")
+            seconds = json.loads(meta.read_text()).get("inference_seconds", 0.0) if meta.is_file() else 0.0
+            entries.append((path.stat().st_mtime, path.stem, path.stat().st_size, seconds))
+        for _, key, size, seconds in sorted(entries):
+            self._index[key] = (size, seconds)
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[Path]:
+        """Chemin du GLB en cache (compté comme hit) ou None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            path = self.directory / f"{key}.glb"
+            if key not in self._index or not path.is_file():
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += self._index[key][1]
+        os.utime(path)
+        return path
+
+    def put(self, key: str, export, inference_seconds: float) -> Path:
+        """
+        Écrit une entrée: export(path) produit le GLB dans un fichier temporaire,
+        renommé atomiquement en <clé>.glb
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = self.directory / f".{key}.{uuid.uuid4().hex}.glb"
+        export(str(staging))
+        path = self.directory / f"{key}.glb"
+        path.with_suffix(".json").write_text(json.dumps({"inference_seconds": inference_seconds}))
+        os.replace(staging, path)
+        with self._lock:
+            self._load_index()
+            self._total_bytes -= self._index.pop(key, (0, 0.0))[0]
+            size = path.stat().st_size
+            self._index[key] = (size, inference_seconds)
+            self._total_bytes += size
+            self._evict()
+        return path
+
+    def _evict(self):
+        # La dernière entrée écrite est toujours conservée (elle va être servie)
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key = next(iter(self._index))
+            size, _ = self._index.pop(key)
+            self._total_bytes -= size
+            for suffix in (".glb", ".json"):
+                (self.directory / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._index),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_inference_seconds": round(self.saved_seconds, 2),
+            }
+
+
+# Instance partagée (configurée par variables d'environnement, 0 Mo = désactivé)
+glb_cache = GLBCache(
+    directory=os.getenv(
+        "GLB_CACHE_DIR",
+        str(Path(tempfile.gettempdir()) / "topology_optimization" / "glb_cache"),
+    ),
+    max_bytes=int(float(os.getenv("GLB_CACHE_MAX_MB", "1024")) * 1024 * 1024),
+)
@@ -0,0 +1,98 @@
+"""
+Prétraitement des images pour TripoSR, entièrement en mémoire
+Décodage, réduction précoce à la taille d'entrée du modèle, suppression du
+fond et recadrage, exécutés dans un pool de threads dédié
+"""
+import asyncio
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Taille d'entrée du modèle: les images plus grandes sont réduites dès le décodage
+MODEL_INPUT_SIZE = int(os.getenv("TRIPOSR_INPUT_SIZE", "512"))
+# Limites: taille du fichier reçu et nombre de pixels avant réduction
+MAX_UPLOAD_BYTES = int(float(os.getenv("GENERATE_3D_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+MAX_IMAGE_PIXELS = int(os.getenv("GENERATE_3D_MAX_PIXELS", str(50_000_000)))
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREPROCESS_WORKERS", "2")),
+    thread_name_prefix="preprocess",
+)
+_rembg_session = None
+_rembg_lock = threading.Lock()
+
+
+class ImageTooLargeError(Exception):
+    """Fichier ou image au-delà des limites configurées"""
+
+
+class InvalidImageError(Exception):
+    """Données impossibles à décoder comme image"""
+
+
+def decode_image(data: bytes, max_side: int = MODEL_INPUT_SIZE) -> Image.Image:
+    """
+    Décode une image en mémoire et la réduit à max_side pixels (plus grand côté)
+    Pour les JPEG, draft() décode directement à une échelle réduite
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Exception as e:
+        raise InvalidImageError(f"Invalid image: {e}")
+    width, height = image.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ImageTooLargeError(f"Image too large: {width}x{height} pixels")
+    image.draft("RGB", (max_side, max_side))
+    image = image.convert("RGB")
+    image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    return image
+
+
+def _session():
+    # Session rembg (modèle de segmentation) créée une fois et réutilisée
+    global _rembg_session
+    with _rembg_lock:
+        if _rembg_session is None:
+            import rembg
+            _rembg_session = rembg.new_session()
+        return _rembg_session
+
+
+def prepare_image(data: bytes, foreground_ratio: float = 0.85) -> Image.Image:
+    """
+    Octets de l'image -> entrée RGB de TripoSR
+    (fond supprimé, objet recadré, composité sur fond gris)
+    """
+    # Décodage d'abord: une image invalide reste une erreur 400, même sans TripoSR
+    image = decode_image(data)
+    from tsr.utils import remove_background, resize_foreground
+
+    image = remove_background(image, _session())
+    image = resize_foreground(image, foreground_ratio)
+    rgba = np.asarray(image).astype(np.float32) / 255.0
+    rgb = rgba[:, :, :3] * rgba[:, :, 3:4] + (1 - rgba[:, :, 3:4]) * 0.5
+    return Image.fromarray((rgb * 255.0).astype(np.uint8))
+
+
+async def prepare_image_async(data: bytes) -> Image.Image:
+    """prepare_image dans le pool de prétraitement (l'event loop reste libre)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, prepare_image, data)
+
+
+async def read_upload(upload, limit: int = MAX_UPLOAD_BYTES) -> bytes:
+    """Lit un UploadFile par blocs en refusant au-delà de limit octets"""
+    chunks, size = [], 0
+    while chunk := await upload.read(1024 * 1024):
+        size += len(chunk)
+        if size > limit:
+            raise ImageTooLargeError(f"Upload exceeds {limit // (1024 * 1024)} MB")
+        chunks.append(chunk)
+    return b"".join(chunks)
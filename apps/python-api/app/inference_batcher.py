@@ -0,0 +1,118 @@
+"""
+Micro-batching des inférences: les requêtes arrivées dans une courte fenêtre
+sont regroupées en un seul appel du modèle, exécuté par un thread dédié hors
+de l'event loop, puis les résultats sont redistribués aux requêtes en attente
+"""
+import asyncio
+import queue
+import threading
+import time
+from typing import Callable, List
+
+
+def _resolve(future: asyncio.Future, result, error):
+    # Exécuté dans l'event loop de la requête
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels submit(item) en lots pour process_batch(items) -> résultats
+
+    Un lot part dès qu'il atteint max_batch_size éléments ou max_wait secondes
+    après l'arrivée de son premier élément (latence ajoutée bornée).
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List], List],
+        max_batch_size: int = 4,
+        max_wait: float = 0.05,
+        name: str = "micro-batcher",
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    async def submit(self, item):
+        """Ajoute item au prochain lot et attend son résultat"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._ensure_worker()
+        self._queue.put((item, loop, future))
+        return await future
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # Arrêt après ce lot
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            results, error = None, None
+            try:
+                results = list(self.process_batch([item for item, _, _ in batch]))
+                if len(results) != len(batch):
+                    # Sinon des requêtes attendraient indéfiniment un résultat manquant
+                    raise RuntimeError(
+                        f"{self.name}: {len(results)} résultats pour un lot de {len(batch)}"
+                    )
+            except Exception as e:
+                error = e
+            self.batches += 1
+            self.items += len(batch)
+            for index, (_, loop, future) in enumerate(batch):
+                result = results[index] if error is None else None
+                try:
+                    loop.call_soon_threadsafe(_resolve, future, result, error)
+                except RuntimeError:
+                    pass  # Event loop de la requête fermée: personne n'attend ce résultat
+
+    def shutdown(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "pending": self._queue.qsize(),
+        }
@@ -0,0 +1,300 @@
+"""
+File de jobs pour les calculs lourds (SIMP + export STL)
+Exécutés dans un ProcessPoolExecutor borné pour ne jamais bloquer l'event loop
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+# Mémoire de pointe d'un job (un calcul FE 50³ atteint ~2.7 Go): borne le nombre
+# de processus par défaut pour qu'un pool plein ne provoque pas d'OOM
+WORKER_MEMORY_MB = int(os.getenv("OPTIMIZATION_WORKER_MEMORY_MB", "3072"))
+
+
+def default_workers(worker_memory_mb: int = WORKER_MEMORY_MB) -> int:
+    """Nombre de processus: cœurs disponibles, limité par la mémoire physique"""
+    cpus = os.cpu_count() or 1
+    try:
+        total_mb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        # Mémoire inconnue (Windows): valeur prudente
+        return min(cpus, 2)
+    return max(1, min(cpus, total_mb // max(1, worker_memory_mb)))
+
+
+class QueueFullError(Exception):
+    """Trop de jobs en attente: la requête doit être retentée plus tard"""
+
+
+class JobCancelledError(Exception):
+    """Le job a été annulé avant la fin"""
+
+
+class ProgressReporter:
+    """
+    Callback de progression transmis au processus de calcul
+
+    Envoie chaque événement au processus principal via une file partagée
+    (multiprocessing.Manager) et interrompt le calcul si le job a été annulé.
+    """
+
+    def __init__(self, job_id: str, queue, cancel_flags):
+        self.job_id = job_id
+        self._queue = queue
+        self._cancel_flags = cancel_flags
+
+    def __call__(self, event: dict):
+        if self._cancel_flags.get(self.job_id):
+            raise JobCancelledError(self.job_id)
+        self._queue.put((self.job_id, event))
+
+
+@dataclass
+class Job:
+    id: str
+    future: Any = field(repr=False)
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    cancelled: bool = False
+    # Derniers événements de progression (numérotés à partir de 1)
+    events: deque = field(default_factory=lambda: deque(maxlen=500), repr=False)
+    event_count: int = 0
+
+    def add_event(self, event: dict):
+        self.event_count += 1
+        self.events.append((self.event_count, event))
+
+    def events_since(self, last_id: int) -> list:
+        return [(event_id, event) for event_id, event in list(self.events) if event_id > last_id]
+
+    @property
+    def status(self) -> str:
+        if self.cancelled or self.future.cancelled():
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.future.exception() is not None else "completed"
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        status = self.status
+        data = {
+            "job_id": self.id,
+            "status": status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if self.events:
+            # Dernière progression connue (sans l'aperçu de densité)
+            last_event = self.events[-1][1]
+            data["progress"] = {k: v for k, v in last_event.items() if k != "density"}
+        if status == "completed" and include_result:
+            data["result"] = self.future.result()
+        elif status == "failed":
+            data["error"] = str(self.future.exception())
+        return data
+
+
+class JobManager:
+    """
+    Soumission, suivi et annulation des jobs d'optimisation
+
+    Le pool de processus est dimensionné sur les cœurs et la mémoire
+    (default_workers); au-delà de max_workers jobs actifs, au plus max_queue
+    jobs attendent leur tour. Si un processus meurt (OOM, segfault), les jobs
+    du pool cassé échouent et un nouveau pool est créé pour les suivants.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: int = 8,
+        max_finished: int = 200,
+    ):
+        self.max_workers = max_workers or default_workers()
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._manager = None
+        self._progress_queue = None
+        self._cancel_flags = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Pool créé à la première soumission (pas de processus au démarrage de l'API)
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Abandonne un pool cassé (le prochain accès à executor en recrée un)"""
+        with self._executor_lock:
+            if self._executor is not executor:
+                return  # Déjà remplacé
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def active_jobs(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    @property
+    def running_jobs(self) -> int:
+        return sum(1 for job in list(self._jobs.values()) if job.status == "running")
+
+    @property
+    def queued_jobs(self) -> int:
+        return sum(1 for job in list(self._jobs.values()) if job.status == "queued")
+
+    def _ensure_progress_channel(self):
+        """File de progression et drapeaux d'annulation partagés avec les processus"""
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+            self._progress_queue = self._manager.Queue()
+            self._cancel_flags = self._manager.dict()
+            threading.Thread(target=self._drain_progress, daemon=True).start()
+
+    def _drain_progress(self):
+        # Thread du processus principal: distribue les événements aux jobs
+        queue = self._progress_queue
+        while True:
+            try:
+                item = queue.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            job_id, event = item
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.add_event(event)
+
+    def submit(self, fn, *args, **kwargs) -> Job:
+        """
+        Soumet fn(*args, **kwargs, progress=ProgressReporter) au pool
+        Lève QueueFullError si la file est pleine
+        """
+        if self.active_jobs >= self.max_workers + self.max_queue:
+            raise QueueFullError(
+                f"File d'attente pleine ({self.max_workers} en cours + {self.max_queue} en attente)"
+            )
+
+        self._ensure_progress_channel()
+        job_id = uuid.uuid4().hex
+        progress = ProgressReporter(job_id, self._progress_queue, self._cancel_flags)
+        executor = self.executor
+        try:
+            future = executor.submit(fn, *args, progress=progress, **kwargs)
+        except BrokenProcessPool:
+            # Processus mort depuis la dernière soumission: nouveau pool
+            self._discard_executor(executor)
+            executor = self.executor
+            future = executor.submit(fn, *args, progress=progress, **kwargs)
+        job = Job(id=job_id, future=future)
+        job.future.add_done_callback(lambda _: self._on_done(job, executor))
+        self._jobs[job.id] = job
+        self._evict_finished()
+        return job
+
+    def completed(self, result) -> Job:
+        """Job déjà terminé (résultat connu, ex: cache), sans passer par le pool"""
+        future = Future()
+        future.set_result(result)
+        job = Job(id=uuid.uuid4().hex, future=future, finished_at=time.time())
+        self._jobs[job.id] = job
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Annule un job: retiré de la file s'il n'a pas démarré, sinon
+        interrompu au prochain rapport de progression (itération SIMP)
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if not job.future.cancel() and not job.future.done():
+            job.cancelled = True
+            self._cancel_flags[job_id] = True
+        return job
+
+    async def wait(self, job: Job):
+        """Attend la fin du job sans bloquer l'event loop et retourne son résultat"""
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            if job.future.cancelled():
+                raise JobCancelledError(job.id)
+            raise
+        if job.cancelled:
+            raise JobCancelledError(job.id)
+        return result
+
+    async def stream_events(self, job: Job, last_id: int = 0, poll_interval: float = 0.2):
+        """
+        Générateur asynchrone des événements de progression du job
+        Se termine par un événement final (completed, failed, cancelled)
+        """
+        while True:
+            for event_id, event in job.events_since(last_id):
+                last_id = event_id
+                yield event_id, "progress", event
+            if job.future.done():
+                # Vider les derniers événements reçus avant la fin du job
+                await asyncio.sleep(poll_interval)
+                for event_id, event in job.events_since(last_id):
+                    last_id = event_id
+                    yield event_id, "progress", event
+                yield last_id + 1, job.status, job.to_dict(include_result=False)
+                return
+            await asyncio.sleep(poll_interval)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._progress_queue.put(None)
+            self._manager.shutdown()
+            self._manager = None
+
+    def _on_done(self, job: Job, executor: Optional[ProcessPoolExecutor] = None):
+        job.finished_at = time.time()
+        if (
+            executor is not None
+            and not job.future.cancelled()
+            and isinstance(job.future.exception(), BrokenProcessPool)
+        ):
+            # Seuls les jobs de ce pool échouent; les suivants iront dans un pool neuf
+            self._discard_executor(executor)
+        if self._cancel_flags is not None:
+            try:
+                self._cancel_flags.pop(job.id, None)
+            except (EOFError, OSError):
+                pass  # Manager arrêté (fin de l'application)
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+# Instance partagée par les routers (configurée par variables d'environnement)
+job_manager = JobManager(
+    max_workers=int(os.getenv("OPTIMIZATION_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("OPTIMIZATION_QUEUE_DEPTH", "8")),
+)
@@ -0,0 +1,115 @@
+"""
+Exporteurs de maillages triangulaires (vertices (n, 3) en mm, faces (m, 3))
+STL binaire (triangles indépendants) et formats indexés à sommets partagés:
+3MF, OBJ, PLY binaire
+"""
+import zipfile
+
+import numpy as np
+
+from app.voxel_mesh import triangle_normals
+
+
+# Enregistrement d'un triangle STL binaire (little-endian, 50 octets)
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2'),
+])
+
+# Face PLY binaire: nombre de sommets (uchar) + 3 indices (int32)
+PLY_FACE_DTYPE = np.dtype([('count', 'u1'), ('indices', '<i4', (3,))])
+
+
+def write_stl(vertices: np.ndarray, faces: np.ndarray, output_path: str):
+    """
+    STL binaire (en-tête 80 octets, nombre de triangles, 50 octets par
+    triangle) avec normales par facette, écrit en un seul appel tofile
+    """
+    records = np.zeros(len(faces), dtype=STL_DTYPE)
+    records['normal'] = triangle_normals(vertices, faces)
+    records['vertices'] = vertices[faces]
+    with open(output_path, 'wb') as f:
+        f.write(b"OptimizedPart - SIMP topology optimization".ljust(80, b" "))
+        f.write(np.uint32(len(faces)).tobytes())
+        records.tofile(f)
+
+
+def write_obj(vertices: np.ndarray, faces: np.ndarray, output_path: str):
+    """Wavefront OBJ (texte, indices à partir de 1)"""
+    with open(output_path, 'w') as f:
+        f.write("# OptimizedPart - SIMP topology optimization (mm)\n")
+        np.savetxt(f, vertices, fmt="v %.6g %.6g %.6g")
+        np.savetxt(f, faces + 1, fmt="f %d %d %d")
+
+
+def write_ply(vertices: np.ndarray, faces: np.ndarray, output_path: str):
+    """PLY binaire little-endian (sommets float32, faces int32)"""
+    records = np.empty(len(faces), dtype=PLY_FACE_DTYPE)
+    records['count'] = 3
+    records['indices'] = faces
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        "comment OptimizedPart - SIMP topology optimization (mm)\n"
+        f"element vertex {len(vertices)}\n"
+        "property float x\nproperty float y\nproperty float z\n"
+        f"element face {len(faces)}\n"
+        "property list uchar int vertex_indices\n"
+        "end_header\n"
+    )
+    with open(output_path, 'wb') as f:
+        f.write(header.encode("ascii"))
+        vertices.astype('<f4').tofile(f)
+        records.tofile(f)
+
+
+_3MF_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>'
+)
+
+_3MF_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>'
+)
+
+
+def write_3mf(vertices: np.ndarray, faces: np.ndarray, output_path: str):
+    """3MF (archive ZIP contenant le modèle XML, unité millimètre)"""
+    vertex_xml = "".join(
+        f'<vertex x="{x:.6g}" y="{y:.6g}" z="{z:.6g}"/>' for x, y, z in vertices.tolist()
+    )
+    triangle_xml = "".join(
+        f'<triangle v1="{a}" v2="{b}" v3="{c}"/>' for a, b, c in faces.tolist()
+    )
+    model = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<model unit="millimeter" xml:lang="en-US" '
+        'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">'
+        '<resources><object id="1" type="model"><mesh>'
+        f'<vertices>{vertex_xml}</vertices><triangles>{triangle_xml}</triangles>'
+        '</mesh></object></resources>'
+        '<build><item objectid="1"/></build></model>'
+    )
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _3MF_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _3MF_RELS)
+        archive.writestr("3D/3dmodel.model", model)
+
+
+# Format -> (fonction d'écriture, extension, type MIME)
+MESH_FORMATS = {
+    "stl": (write_stl, ".stl", "model/stl"),
+    "3mf": (write_3mf, ".3mf", "model/3mf"),
+    "obj": (write_obj, ".obj", "model/obj"),
+    "ply": (write_ply, ".ply", "application/x-ply"),
+}
+
+MEDIA_TYPES = {extension: media_type for _, extension, media_type in MESH_FORMATS.values()}
@@ -0,0 +1,59 @@
+"""
+Profilage à la demande d'une requête (cProfile), réservé aux administrateurs
+Activé par l'en-tête X-Profile-Token égal à PROFILING_TOKEN; sans en-tête, les
+requêtes ne passent par aucun code de profilage (coût nul en production)
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+
+from app.artifacts import artifact_store
+
+# Profil binaire (pstats: snakeviz, python -m pstats) et résumé texte
+PROFILE_FILE = "profile.pstats"
+PROFILE_SUMMARY_FILE = "profile.txt"
+PROFILE_HEADER = "X-Profile-Token"
+
+# Jeton d'administration (vide = profilage désactivé sur ce déploiement)
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+
+
+class ProfilingForbiddenError(Exception):
+    """En-tête de profilage présent mais jeton absent ou invalide"""
+
+
+def profiling_requested(token) -> bool:
+    """
+    True si la requête demande un profilage autorisé
+    Lève ProfilingForbiddenError si l'en-tête est fourni avec un mauvais jeton
+    """
+    if token is None:
+        return False
+    if not PROFILING_TOKEN or not hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode()):
+        raise ProfilingForbiddenError("Profilage non autorisé")
+    return True
+
+
+def run_profiled(fn, *args, **kwargs):
+    """Exécute fn sous cProfile (thread courant), retourne (résultat, profiler)"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+    return result, profiler
+
+
+def save_profile(profiler: cProfile.Profile, artifact_id: str, limit: int = 60) -> str:
+    """
+    Écrit le profil (pstats + top des fonctions par temps cumulé) dans le
+    dossier d'artefacts, retourne l'URL de téléchargement du fichier pstats
+    """
+    profiler.dump_stats(str(artifact_store.path(artifact_id, PROFILE_FILE)))
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(limit)
+    artifact_store.path(artifact_id, PROFILE_SUMMARY_FILE).write_text(summary.getvalue())
+    return artifact_store.url(artifact_id, PROFILE_FILE)
@@ -0,0 +1,200 @@
+"""
+Cache des résultats d'optimisation adressé par contenu
+Clé = SHA-256 de la requête canonicalisée; chaque entrée est un dossier
+<clé>/ sur disque (result.json, density.npy, part.<format>) avec éviction LRU
+bornée en taille et un index en mémoire
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+# À incrémenter quand l'algorithme change (invalide les entrées existantes)
+CACHE_VERSION = 4
+
+RESULT_FILE = "result.json"
+DENSITY_FILE = "density.npy"
+MESH_STEM = "part"  # part.stl, part.3mf, ...
+
+
+def request_key(canonical: dict) -> str:
+    """Hash SHA-256 d'une requête canonicalisée (clés triées, JSON compact)"""
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "request": canonical},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class ResultCache:
+    """
+    Cache disque des réponses /api/optimize (métriques, densité, maillage)
+
+    L'écriture d'une entrée (write_entry) peut se faire depuis un processus
+    de calcul; l'index, les compteurs et l'éviction vivent dans le processus
+    de l'API (register, get).
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # clé -> taille (octets)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load_index(self):
+        # Reconstruit l'index au premier accès (entrées triées par dernier accès)
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.is_dir():
+            return
+        entries = []
+        for path in self.directory.iterdir():
+            if path.is_dir() and (path / RESULT_FILE).is_file():
+                entries.append((path.stat().st_mtime, path.name, _entry_size(path)))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Réponse en cache (sans density_field, voir load_density) ou None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+        path = self.directory / key
+        try:
+            result = json.loads((path / RESULT_FILE).read_text())
+            os.utime(path)  # Ordre LRU conservé au redémarrage
+        except (OSError, ValueError):
+            # Entrée supprimée ou corrompue: traitée comme un miss
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+                self._drop(key)
+            return None
+        return result
+
+    def load_density(self, key: str) -> Optional[np.ndarray]:
+        """Champ de densité en cache, projeté en mémoire (mmap)"""
+        path = self.directory / key / DENSITY_FILE
+        with self._lock:
+            self._load_index()  # Liens valides dès le redémarrage, sans get() préalable
+            if key not in self._index:
+                return None
+        if not path.is_file():
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def mesh_path(self, key: str) -> Optional[Path]:
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                return None
+        return next((self.directory / key).glob(f"{MESH_STEM}.*"), None)
+
+    def write_entry(
+        self,
+        key: str,
+        response: dict,
+        mesh_path: Optional[str] = None,
+        density: Optional[np.ndarray] = None,
+    ):
+        """
+        Écrit une entrée sur disque (dossier temporaire puis renommage atomique)
+        La densité brute est stockée en .npy (réencodée à chaque hit selon la
+        requête), le reste de la réponse en JSON
+        """
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = self.directory / f".{key}.{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            result = {k: v for k, v in response.items() if k != "density_field"}
+            if density is not None:
+                np.save(staging / DENSITY_FILE, density)
+            (staging / RESULT_FILE).write_text(json.dumps(result))
+            if mesh_path and os.path.isfile(mesh_path):
+                shutil.copyfile(mesh_path, staging / (MESH_STEM + Path(mesh_path).suffix))
+            os.replace(staging, self.directory / key)
+        except OSError:
+            # Entrée déjà écrite par un job concurrent (ou disque plein)
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def register(self, key: str):
+        """Indexe une entrée écrite par write_entry et applique l'éviction LRU"""
+        path = self.directory / key
+        if not self.enabled or not (path / RESULT_FILE).is_file():
+            return
+        with self._lock:
+            self._load_index()
+            self._total_bytes -= self._index.pop(key, 0)
+            size = _entry_size(path)
+            self._index[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        self._total_bytes -= self._index.pop(key, 0)
+        shutil.rmtree(self.directory / key, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._index),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Instance partagée (configurée par variables d'environnement, 0 Mo = désactivé)
+result_cache = ResultCache(
+    directory=os.getenv(
+        "RESULT_CACHE_DIR",
+        str(Path(tempfile.gettempdir()) / "topology_optimization" / "cache"),
+    ),
+    max_bytes=int(float(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024),
+)
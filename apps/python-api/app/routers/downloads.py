@@ -0,0 +1,38 @@
+"""
+Router de téléchargement des artefacts de jobs (maillages, densités, GLB, profils)
+Toujours monté: les liens /api/download/... produits par chaque groupe de
+routers (optimisation, génération 3D, profilage) restent valides quel que
+soit ENABLED_ROUTERS
+"""
+from fastapi import APIRouter, HTTPException, Header
+from typing import Optional
+
+from app.artifacts import artifact_store
+from app.downloads import file_download
+from app.mesh_export import MEDIA_TYPES
+
+router = APIRouter()
+
+# Types des fichiers d'artefacts hors maillages d'optimisation
+ARTIFACT_MEDIA_TYPES = {**MEDIA_TYPES, ".glb": "model/gltf-binary", ".txt": "text/plain; charset=utf-8"}
+
+
+@router.get("/download/{artifact_id}/{filename}")
+async def download_artifact(
+    artifact_id: str,
+    filename: str,
+    accept_encoding: Optional[str] = Header(default=None),
+    range: Optional[str] = Header(default=None),
+):
+    """
+    Télécharge un fichier d'un job (maillage STL/3MF/OBJ/PLY, density.npy,
+    modèle GLB ou profil cProfile)
+    Supporte les requêtes partielles (Range) et gzip en streaming
+    """
+    file_path = artifact_store.path(artifact_id, filename)
+
+    if file_path is None or not file_path.is_file():
+        raise HTTPException(status_code=404, detail="Fichier introuvable")
+
+    media_type = ARTIFACT_MEDIA_TYPES.get(file_path.suffix, "application/octet-stream")
+    return file_download(file_path, media_type, filename, accept_encoding, range)
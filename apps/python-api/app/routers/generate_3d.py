@@ -2,119 +2,232 @@
 Router pour génération 3D avec TripoSR
 Convertit une image en modèle 3D GLB
 """
-from fastapi import APIRouter, File, UploadFile, Form
+from fastapi import APIRouter, File, UploadFile, Form, Header
 from fastapi.responses import FileResponse, JSONResponse
-import io
+from typing import Optional
+import asyncio
 import base64
-import tempfile
-import os
+import binascii
 import logging
-from pathlib import Path
-import torch
+import time
+
+from app.artifacts import artifact_store
+from app.glb_cache import glb_cache, image_key
+from app.image_preprocessing import (
+    MAX_UPLOAD_BYTES,
+    ImageTooLargeError,
+    InvalidImageError,
+    prepare_image,
+    prepare_image_async,
+    read_upload,
+)
+from app.profiling import ProfilingForbiddenError, profiling_requested, run_profiled, save_profile
+from app.telemetry import PhaseTimer, log_event, metrics_registry
+from app.triposr import ModelUnavailableError, inference_batcher, model_registry
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Import TripoSR - on va l'installer si nécessaire
-try:
-    from PIL import Image
-    import numpy as np
-except ImportError:
-    logger.warning("PIL not installed, image features may not work")
+# Prometheus metrics (GET /metrics)
+generation_phase_duration = metrics_registry.histogram(
+    "generate3d_phase_seconds", "Durée des phases de /api/generate-3d"
+)
+metrics_registry.gauge_callback(
+    "triposr_batch_queue_depth", "Images en attente du prochain lot TripoSR",
+    lambda: inference_batcher.stats()["pending"],
+)
+metrics_registry.counter_callback(
+    "triposr_batches_total", "Lots TripoSR exécutés", lambda: inference_batcher.batches,
+)
+metrics_registry.gauge_callback(
+    "triposr_model_load_seconds", "Durée du chargement du modèle TripoSR",
+    lambda: model_registry.load_seconds,
+)
+metrics_registry.gauge_callback(
+    "triposr_model_ready", "1 si le modèle TripoSR est chargé",
+    lambda: int(model_registry.ready),
+)
+metrics_registry.counter_callback(
+    "generate3d_cache_requests_total", "Consultations du cache GLB, par issue",
+    lambda: [({"result": "hit"}, glb_cache.hits), ({"result": "miss"}, glb_cache.misses)],
+)
+
+
+def _server_timing(timings: dict) -> str:
+    """Server-Timing header (durations in ms, shown in the browser devtools)"""
+    return ", ".join(f"{phase};dur={entry['seconds'] * 1000:.1f}" for phase, entry in timings.items())
+
+
+def _profiled_generation(image_data: bytes):
+    """
+    Whole pipeline in the calling thread (profiled requests only): no
+    batching and no GLB cache, so cProfile sees preprocessing, inference and export
+    """
+    processed = prepare_image(image_data)
+    mesh = model_registry.infer(processed)
+    artifact_id = artifact_store.create()
+    output_path = artifact_store.path(artifact_id, "model.glb")
+    mesh.export(str(output_path))
+    return artifact_id, output_path
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse(
+        {"success": False, "error": message, "isDemoMode": True},
+        status_code=status_code,
+    )
+
+
+def _model_unavailable() -> JSONResponse:
+    logger.error("TripoSR not installed - this feature requires: pip install TripoSR")
+    return _error(
+        "TripoSR not installed on backend. Install with: pip install git+https://github.com/VAST-AI-Research/TripoSR.git",
+        503,
+    )
+
 
 @router.post("/generate-3d")
 async def generate_3d(
-    image_base64: str = Form(...),
+    image: Optional[UploadFile] = File(default=None),
+    image_base64: Optional[str] = Form(default=None),
     product_name: str = Form(default="Product"),
+    x_profile_token: Optional[str] = Header(default=None),
 ):
     """
-    Generate 3D model from base64 image using TripoSR
+    Generate 3D model from an image using TripoSR
     
     Args:
-        image_base64: Base64 encoded image
+        image: Image file (multipart upload, preferred)
+        image_base64: Base64 encoded image (legacy clients)
         product_name: Product name (for logging/naming)
+        x_profile_token: PROFILING_TOKEN to run the request under cProfile
+            (profile linked in the X-Profile-Url response header)
     
     Returns:
         GLB file or error message
     """
+    try:
+        profile = profiling_requested(x_profile_token)
+    except ProfilingForbiddenError as e:
+        return _error(str(e), 403)
+    timer = PhaseTimer()
     try:
         logger.info(f"🎨 Starting 3D generation for: {product_name}")
         
-        # Decode base64 image
-        image_data = base64.b64decode(image_base64.split(',')[1] if ',' in image_base64 else image_base64)
-        
-        # Save temporarily
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_img:
-            tmp_img.write(image_data)
-            img_path = tmp_img.name
-        
-        logger.info(f"📸 Image saved to: {img_path}")
-        
-        # Import TripoSR
+        # Read image bytes in memory (size-limited)
         try:
-            from tsr.system import TSR
-            from tsr.utils import remove_background, resize_foreground
-        except ImportError:
-            logger.error("TripoSR not installed - this feature requires: pip install TripoSR")
-            return JSONResponse(
-                {
-                    "success": False,
-                    "error": "TripoSR not installed on backend. Install with: pip install git+https://github.com/VAST-AI-Research/TripoSR.git",
-                    "isDemoMode": True
-                },
-                status_code=503
-            )
+            with timer.phase("read"):
+                if image is not None:
+                    image_data = await read_upload(image)
+                elif image_base64:
+                    encoded = image_base64.split(',')[1] if ',' in image_base64 else image_base64
+                    if len(encoded) * 3 // 4 > MAX_UPLOAD_BYTES:
+                        raise ImageTooLargeError(f"Image exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                    image_data = base64.b64decode(encoded)
+                else:
+                    return _error("No image provided (expected 'image' file or 'image_base64')", 400)
+        except ImageTooLargeError as e:
+            return _error(str(e), 413)
+        except binascii.Error as e:
+            return _error(f"Invalid base64 image: {e}", 400)
         
-        # Load TripoSR model
-        logger.info("⏳ Loading TripoSR model...")
-        device = "cuda" if os.environ.get("USE_CUDA", "false").lower() == "true" else "cpu"
-        model = TSR.from_pretrained(
-            "JeffreyXiang/TripoSR",
-            cache_dir=".cache/triposr",
-            device=device
-        )
-        logger.info(f"✓ Model loaded on device: {device}")
-        
-        # Load and preprocess image
+        # Profiled requests load the model first, outside the profile: only a
+        # missing TripoSR maps to 503, errors inside the pipeline stay 500
+        if profile:
+            try:
+                with timer.phase("model_load"):
+                    await asyncio.to_thread(model_registry.load)
+            except ModelUnavailableError:
+                return _model_unavailable()
+
+        # Preprocess (thread pool); the model is only needed on a cache miss
         logger.info("🖼️  Processing image...")
-        image = Image.open(img_path).convert('RGB')
-        
-        # Remove background if needed
-        image = remove_background(image)
-        image = resize_foreground(image, 0.85)
+        try:
+            if profile:
+                with timer.phase("profiled_generation"):
+                    (artifact_id, output_path), profiler = await asyncio.to_thread(
+                        run_profiled, _profiled_generation, image_data
+                    )
+            else:
+                with timer.phase("preprocess"):
+                    try:
+                        processed = await prepare_image_async(image_data)
+                    except ImportError:
+                        # Background removal comes with TripoSR (tsr.utils, rembg)
+                        return _model_unavailable()
+        except ImageTooLargeError as e:
+            return _error(str(e), 413)
+        except InvalidImageError as e:
+            return _error(str(e), 400)
         
-        # Generate 3D model
-        logger.info("🎯 Generating 3D model...")
-        with torch.no_grad():
-            scene_codes = model(image, remesh=True, chunk_size=8)
+        if profile:
+            profile_url = await asyncio.to_thread(save_profile, profiler, artifact_id)
+            log_event("generate_3d_profiled", product_name=product_name, profile_url=profile_url)
+            return FileResponse(
+                output_path,
+                media_type="model/gltf-binary",
+                filename=f"{product_name}.glb",
+                headers={"X-Profile-Url": profile_url, "Server-Timing": _server_timing(timer.as_dict())},
+            )
         
-        # Export to GLB
-        logger.info("💾 Exporting to GLB...")
-        output_dir = tempfile.gettempdir()
-        output_path = os.path.join(output_dir, f"{product_name.replace(' ', '_')}_model.glb")
+        # Same preprocessed image already generated: serve the cached GLB
+        with timer.phase("cache_lookup"):
+            key = image_key(processed, model_registry.model_name, model_registry.mc_resolution)
+            output_path = glb_cache.get(key)
+        cache_hit = output_path is not None
+        if cache_hit:
+            logger.info(f"♻️ Cached 3D model: {key[:12]}")
+        else:
+            # Shared model, loaded once per process. Cache hits never wait for the
+            # weights, but preprocessing (tsr.utils, rembg) still needs TripoSR installed
+            try:
+                with timer.phase("model_load"):
+                    await asyncio.to_thread(model_registry.load)
+            except ModelUnavailableError:
+                return _model_unavailable()
+
+            # Generate 3D model (batched with concurrent requests, off the event loop)
+            logger.info("🎯 Generating 3D model...")
+            start = time.perf_counter()
+            mesh = await inference_batcher.submit(processed)
+            inference_seconds = time.perf_counter() - start
+            timer.add("inference", inference_seconds)
+            
+            # Export to GLB (unique name: content key, or the job's artifact folder)
+            logger.info("💾 Exporting to GLB...")
+            with timer.phase("export"):
+                if glb_cache.enabled:
+                    output_path = await asyncio.to_thread(glb_cache.put, key, mesh.export, inference_seconds)
+                else:
+                    output_path = artifact_store.path(artifact_store.create(), "model.glb")
+                    await asyncio.to_thread(mesh.export, str(output_path))
+            logger.info(f"✓ Model exported to: {output_path}")
         
-        model.export(scene_codes, output_path)
-        logger.info(f"✓ Model exported to: {output_path}")
+        timings = timer.as_dict()
+        for phase, entry in timings.items():
+            generation_phase_duration.observe(entry["seconds"], phase=phase)
+        log_event(
+            "generate_3d",
+            product_name=product_name,
+            cache_hit=cache_hit,
+            timings={phase: entry["seconds"] for phase, entry in timings.items()},
+        )
         
-        # Return GLB file
+        # Return GLB file (phase timings in the Server-Timing header)
         return FileResponse(
             output_path,
             media_type="model/gltf-binary",
-            filename=f"{product_name}.glb"
+            filename=f"{product_name}.glb",
+            headers={"Server-Timing": _server_timing(timings)},
         )
         
     except Exception as e:
         logger.error(f"❌ Error generating 3D model: {str(e)}", exc_info=True)
-        return JSONResponse(
-            {
-                "success": False,
-                "error": f"3D generation failed: {str(e)}",
-                "isDemoMode": True
-            },
-            status_code=500
-        )
-    finally:
-        # Cleanup
-        if 'img_path' in locals() and os.path.exists(img_path):
-            os.unlink(img_path)
+        return _error(f"3D generation failed: {str(e)}", 500)
+
+
+@router.get("/generate-3d/cache")
+async def generate_3d_cache_stats():
+    """GLB cache statistics (entries, size, hit rate, saved inference seconds)"""
+    return glb_cache.stats()
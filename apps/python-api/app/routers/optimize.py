@@ -1,26 +1,70 @@
 """
 Router FastAPI pour l'optimisation topologique
-Endpoint: POST /api/optimize
+Endpoints: POST /api/optimize (synchrone), /api/optimize/jobs (asynchrone)
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, PositiveFloat, conlist, model_validator
+from typing import Optional, List, Literal, Union
 import numpy as np
+import json
+import math
 import os
-from pathlib import Path
+import time
 
-from app.simp_optimizer import SIMPOptimizer
+from app.artifacts import artifact_store
+from app.density_encoding import encode_density, quantize_density
+from app.downloads import file_download
+from app.jobs import JobCancelledError, QueueFullError, job_manager
+from app.mesh_export import MEDIA_TYPES, MESH_FORMATS
+from app.profiling import ProfilingForbiddenError, profiling_requested, run_profiled, save_profile
+from app.result_cache import request_key, result_cache
+from app.simp_optimizer import SIMPOptimizer, downsample_density, grid_shape
 from app.stl_generator import STLGenerator
+from app.telemetry import PhaseTimer, log_event, metrics_registry
 
 
 router = APIRouter()
 
+# Taille maximale de la grille acceptée par l'API (voxels), plus basse pour le
+# solveur assemblé: un calcul "sparse" 50³ occupe déjà ~2.7 Go
+MAX_GRID_ELEMENTS = int(os.getenv("MAX_GRID_ELEMENTS", "1000000"))
+MAX_SPARSE_GRID_ELEMENTS = int(os.getenv("MAX_SPARSE_GRID_ELEMENTS", "125000"))
+
+# Métriques Prometheus (GET /metrics): phases mesurées dans les processus de
+# calcul et remontées avec le résultat de chaque job
+optimization_phase_duration = metrics_registry.histogram(
+    "optimization_phase_seconds", "Durée des phases du pipeline SIMP -> maillage, par job"
+)
+optimization_iterations = metrics_registry.counter(
+    "optimization_iterations_total", "Itérations SIMP exécutées, par solveur"
+)
+optimization_jobs = metrics_registry.counter(
+    "optimization_jobs_total", "Jobs d'optimisation terminés, par statut"
+)
+metrics_registry.gauge_callback(
+    "optimization_jobs_running", "Jobs d'optimisation en cours de calcul",
+    lambda: job_manager.running_jobs,
+)
+metrics_registry.gauge_callback(
+    "optimization_queue_depth", "Jobs d'optimisation en attente d'un processus",
+    lambda: job_manager.queued_jobs,
+)
+metrics_registry.counter_callback(
+    "optimization_cache_requests_total", "Consultations du cache de résultats, par issue",
+    lambda: [({"result": "hit"}, result_cache.hits), ({"result": "miss"}, result_cache.misses)],
+)
+metrics_registry.counter_callback(
+    "optimization_cache_evictions_total", "Entrées évincées du cache de résultats",
+    lambda: result_cache.evictions,
+)
+
 
 # Modèles Pydantic pour validation
 class GeometryParams(BaseModel):
     shape: str = "box"
-    dimensions: List[float]  # [length, width, height] en mm
+    # [length, width, height] en mm, strictement positifs (grille dérivée finie)
+    dimensions: conlist(PositiveFloat, min_length=3, max_length=3)
 
 
 class MaterialParams(BaseModel):
@@ -74,10 +118,57 @@ class ConstraintParams(BaseModel):
     safety_factor: float = 2.0
 
 
+class ResolutionLevel(BaseModel):
+    scale: float = Field(gt=0, lt=1)  # Facteur de la grille fine, par axe
+    iterations: int = Field(ge=1)
+
+
 class OptimizationParams(BaseModel):
-    resolution: int = 25  # Grille 3D (25x25x25 = 15k voxels)
+    resolution: int = Field(default=25, ge=1)  # Grille 3D (25x25x25 = 15k voxels)
+    # Grille anisotrope dérivée de geometry.dimensions (voxels quasi cubiques)
+    voxel_size: Optional[float] = Field(default=None, gt=0)  # Taille cible d'un voxel en mm
+    voxel_budget: Optional[int] = Field(default=None, gt=0)  # Nombre total de voxels (prioritaire)
     iterations: int = 50
+    # Continuation multi-résolution: niveaux grossiers exécutés avant la grille
+    # fine (ex: [{"scale": 0.25, "iterations": 40}, {"scale": 0.5, "iterations": 20}]),
+    # puis `iterations` itérations à pleine résolution
+    levels: Optional[List[ResolutionLevel]] = None
+    # Critères d'arrêt anticipé (None = désactivé)
+    max_density_change: Optional[float] = 0.01  # max|x_new - x| entre deux itérations
+    compliance_tol: Optional[float] = None  # Variation relative de compliance sur la fenêtre
+    compliance_window: int = 5
+    time_budget: Optional[float] = None  # Secondes
+    # Aperçu de densité dans le flux de progression (tous les N itérations, None = jamais)
+    progress_snapshot_every: Optional[int] = None
+    progress_snapshot_factor: int = 2  # Facteur de sous-échantillonnage de l'aperçu
     density_threshold: float = 0.5  # Pour export STL
+    # "surface": faces extérieures des voxels, "greedy": faces coplanaires fusionnées
+    # (moins de triangles), "marching_cubes": isosurface lisse (scikit-image),
+    # "build123d": fusion B-rep de boxes (lent)
+    mesh_method: Literal["surface", "greedy", "marching_cubes", "build123d"] = "surface"
+    output_format: Literal["stl", "3mf", "obj", "ply"] = "stl"  # 3MF/OBJ/PLY: sommets partagés
+    # "fast": heuristique, "sparse": FEA hexaédrique assemblée, "matrix_free": FEA sans matrice
+    solver: Literal["fast", "sparse", "matrix_free"] = "fast"
+    preconditioner: Literal["jacobi", "multigrid"] = "multigrid"  # Solveurs FE uniquement
+    # Filtre en cône "sensitivity" (sensibilités) ou "density" (densités, projection
+    # optionnelle), "gaussian" = ancien lissage; rayon en mm (défaut: 1.5 voxel)
+    filter_type: Literal["sensitivity", "density", "gaussian"] = "sensitivity"
+    filter_radius: Optional[float] = Field(default=None, gt=0)
+    # Projection de Heaviside (filter_type="density"): raideur ~4-16, designs plus nets
+    projection_beta: Optional[float] = Field(default=None, gt=0)
+    projection_eta: float = Field(default=0.5, gt=0, lt=1)
+    use_cache: bool = True  # Réutiliser un résultat identique déjà calculé
+    # Champ de densité dans la réponse: "list" (listes JSON), "base64" (quantifié
+    # + zlib), "link" (URL de l'endpoint binaire) ou "none"
+    density_encoding: Literal["list", "base64", "link", "none"] = "list"
+    density_dtype: Literal["uint8", "float16"] = "uint8"  # Quantification base64/link
+    density_downsample: int = Field(default=1, ge=1)  # Réduction par blocs
+
+    @model_validator(mode="after")
+    def _check_projection(self):
+        if self.projection_beta is not None and self.filter_type != "density":
+            raise ValueError("projection_beta requiert filter_type='density'")
+        return self
 
 
 class OptimizationRequest(BaseModel):
@@ -87,19 +178,110 @@ class OptimizationRequest(BaseModel):
     constraints: ConstraintParams
     optimization: OptimizationParams
 
+    @model_validator(mode="after")
+    def _check_grid_size(self):
+        # Refus (422) des grilles trop grandes avant d'occuper un processus de calcul
+        params = self.optimization
+        if params.voxel_budget is None and params.voxel_size is not None:
+            # Estimation flottante: un voxel_size minuscule déborderait les entiers
+            lengths = np.asarray(self.geometry.dimensions[:3], dtype=float)
+            with np.errstate(over="ignore"):
+                elements = float(np.prod(np.maximum(1.0, np.round(lengths / params.voxel_size))))
+        else:
+            elements = math.prod(grid_shape(
+                tuple(self.geometry.dimensions), params.resolution, None, params.voxel_budget
+            ))
+        limit = MAX_SPARSE_GRID_ELEMENTS if params.solver == "sparse" else MAX_GRID_ELEMENTS
+        if elements > limit:
+            raise ValueError(
+                f"Grille trop grande ({elements:.0f} voxels, maximum {limit} "
+                f"pour le solveur {params.solver}): "
+                "réduire resolution, augmenter voxel_size ou réduire voxel_budget"
+            )
+        return self
+
 
 class OptimizationResponse(BaseModel):
     success: bool
     stl_url: str
     metrics: dict
-    density_field: Optional[List] = None
+    density_field: Optional[Union[List, dict]] = None  # Voir density_encoding
+    artifact_id: Optional[str] = None  # Fichiers du job: /api/download/{artifact_id}/...
+    profile_url: Optional[str] = None  # Profil cProfile (requête profilée, voir X-Profile-Token)
     message: str
 
 
-@router.post("/optimize", response_model=OptimizationResponse)
-async def optimize_topology(request: OptimizationRequest):
+# Paramètres sans effet sur le résultat (exclus de la clé de cache)
+_UNCACHED_PARAMS = {
+    "progress_snapshot_every", "progress_snapshot_factor", "use_cache",
+    "density_encoding", "density_dtype", "density_downsample",
+}
+
+
+def cache_key(request: OptimizationRequest) -> str:
+    """
+    Clé de cache de la requête canonicalisée
+    Les deux formats acceptés (E/youngs_modulus, magnitude/force_magnitude, ...)
+    sont ramenés aux valeurs effectivement utilisées par l'optimisation
+    """
+    material = request.material
+    loads = request.loads
+    canonical = {
+        "geometry": request.geometry.model_dump(),
+        "material": {
+            "youngs_modulus": material.get_youngs_modulus(),
+            "poisson_ratio": material.get_poisson_ratio(),
+            "density": material.density,
+        },
+        "loads": {
+            "force_magnitude": loads.get_force_magnitude(),
+            "force_direction": [float(c) for c in loads.get_force_direction()],
+            "application_zone": loads.application_zone,
+        },
+        "constraints": {
+            **request.constraints.model_dump(),
+            "fixed_faces": sorted(set(request.constraints.fixed_faces)),
+        },
+        "optimization": request.optimization.model_dump(exclude=_UNCACHED_PARAMS),
+    }
+    return request_key(canonical)
+
+
+def _progress_handler(progress, optimizer, params: OptimizationParams):
+    """Ajoute un aperçu sous-échantillonné de la densité aux événements de progression"""
+    if progress is None:
+        return None
+
+    def report(event: dict):
+        every = params.progress_snapshot_every
+        if every and event['iteration'] % every == 0:
+            preview = downsample_density(optimizer.density, params.progress_snapshot_factor)
+            event['density'] = {
+                'shape': list(preview.shape),
+                'values': np.round(preview, 3).ravel().tolist(),
+            }
+        progress(event)
+
+    return report
+
+
+def _density_payload(density: np.ndarray, params: OptimizationParams, ref: str):
+    """Champ de densité encodé selon la requête (ref: artefact ou clé de cache)"""
+    return encode_density(
+        density,
+        encoding=params.density_encoding,
+        dtype=params.density_dtype,
+        downsample=params.density_downsample,
+        url=f"/api/optimize/density/{ref}",
+    )
+
+
+def run_optimization(payload: dict, progress=None, cache_key: str = None, profile: bool = False) -> dict:
     """
     Optimise la topologie d'une pièce avec l'algorithme SIMP
+    Exécuté dans un processus du pool de jobs (payload = OptimizationRequest sérialisé,
+    progress = callback de progression du job, cache_key = entrée de cache à écrire,
+    profile = exécution sous cProfile, profil enregistré avec les artefacts du job)
     
     Flow:
     1. Initialiser SIMP avec paramètres
@@ -107,92 +289,255 @@ async def optimize_topology(request: OptimizationRequest):
     3. Exécuter optimisation (50 itérations)
     4. Générer STL avec Build123d
     5. Retourner URL du fichier + métriques
+
+    metrics['timings'] détaille la durée de chaque phase (setup, phases SIMP,
+    mesh_extraction, mesh_write, metrics, serialization, cache_write)
     """
-    try:
-        print(f"\n{'='*60}")
-        print(f"🚀 NOUVELLE OPTIMISATION TOPOLOGIQUE")
-        print(f"{'='*60}")
-        print(f"Géométrie: {request.geometry.shape} - {request.geometry.dimensions} mm")
-        youngs_mod = request.material.get_youngs_modulus()
-        print(f"Matériau: {request.material.name} (E={youngs_mod/1e9:.1f} GPa)")
-        force_mag = request.loads.get_force_magnitude()
-        force_dir = request.loads.get_force_direction()
-        print(f"Force: {force_mag} N {force_dir}")
-        print(f"Résolution: {request.optimization.resolution}³ voxels")
-        print(f"Itérations: {request.optimization.iterations}")
-        print(f"{'='*60}\n")
-        
-        # Étape 1: Initialiser SIMP
+    if profile:
+        response, profiler = run_profiled(run_optimization, payload, progress, cache_key)
+        response["profile_url"] = save_profile(profiler, response["artifact_id"])
+        return response
+
+    pipeline_start = time.perf_counter()
+    timer = PhaseTimer()
+    request = OptimizationRequest(**payload)
+
+    print(f"\n{'='*60}")
+    print(f"🚀 NOUVELLE OPTIMISATION TOPOLOGIQUE")
+    print(f"{'='*60}")
+    print(f"Géométrie: {request.geometry.shape} - {request.geometry.dimensions} mm")
+    youngs_mod = request.material.get_youngs_modulus()
+    print(f"Matériau: {request.material.name} (E={youngs_mod/1e9:.1f} GPa)")
+    force_mag = request.loads.get_force_magnitude()
+    force_dir = request.loads.get_force_direction()
+    print(f"Force: {force_mag} N {force_dir}")
+    nx, ny, nz = grid_shape(
+        tuple(request.geometry.dimensions),
+        request.optimization.resolution,
+        request.optimization.voxel_size,
+        request.optimization.voxel_budget,
+    )
+    print(f"Grille: {nx}x{ny}x{nz} voxels")
+    print(f"Itérations: {request.optimization.iterations}")
+    if request.optimization.levels:
+        schedule = ", ".join(f"×{level.scale}: {level.iterations}" for level in request.optimization.levels)
+        print(f"Niveaux grossiers: {schedule}")
+    print(f"Solveur: {request.optimization.solver}")
+    print(f"{'='*60}\n")
+
+    # Étape 1: Initialiser SIMP
+    with timer.phase("setup"):
         optimizer = SIMPOptimizer(
             dimensions=tuple(request.geometry.dimensions),
             resolution=request.optimization.resolution,
+            voxel_size=request.optimization.voxel_size,
+            voxel_budget=request.optimization.voxel_budget,
             volume_fraction=request.constraints.volume_fraction,
             penal=3.0,
-            rmin=1.5,
+            rmin=request.optimization.filter_radius,
+            solver=request.optimization.solver,
+            preconditioner=request.optimization.preconditioner,
+            youngs_modulus=youngs_mod,
+            poisson_ratio=request.material.get_poisson_ratio(),
+            filter_type=request.optimization.filter_type,
+            projection_beta=request.optimization.projection_beta,
+            projection_eta=request.optimization.projection_eta,
         )
-        
+
         # Étape 2: Appliquer charges et contraintes
         optimizer.apply_loads_and_constraints(
             force_magnitude=force_mag,
             force_direction=force_dir,
             fixed_faces=request.constraints.fixed_faces,
         )
-        
-        # Étape 3: Optimisation SIMP
-        density_field, simp_metrics = optimizer.optimize(
-            iterations=request.optimization.iterations
-        )
-        
-        # Étape 4: Générer STL
-        print("\n📐 Génération du fichier STL...")
-        stl_gen = STLGenerator(
-            density_field=density_field,
-            dimensions=tuple(request.geometry.dimensions)
-        )
-        
-        stl_path = stl_gen.generate_stl(
-            threshold=request.optimization.density_threshold
-        )
-        
-        # Étape 5: Calculer métriques finales
+
+    # Étape 3: Optimisation SIMP (phases fea, filter, oc_update... mesurées par l'optimiseur)
+    criteria = dict(
+        iterations=request.optimization.iterations,
+        max_density_change=request.optimization.max_density_change,
+        compliance_tol=request.optimization.compliance_tol,
+        compliance_window=request.optimization.compliance_window,
+        time_limit=request.optimization.time_budget,
+        progress_callback=_progress_handler(progress, optimizer, request.optimization),
+    )
+    if request.optimization.levels:
+        levels = [(level.scale, level.iterations) for level in request.optimization.levels]
+        density_field, simp_metrics = optimizer.optimize_multilevel(levels, **criteria)
+    else:
+        density_field, simp_metrics = optimizer.optimize(**criteria)
+    timer.update(simp_metrics.pop('timings'))
+
+    # Étape 4: Générer STL (dans le dossier d'artefacts propre au job)
+    print("\n📐 Génération du fichier STL...")
+    with timer.phase("artifact_write"):
+        artifact_id = artifact_store.create()
+        artifact_store.save_density(artifact_id, density_field)
+    stl_gen = STLGenerator(
+        density_field=density_field,
+        dimensions=tuple(request.geometry.dimensions)
+    )
+
+    _, extension, _ = MESH_FORMATS[request.optimization.output_format]
+    stl_path = stl_gen.generate_stl(
+        threshold=request.optimization.density_threshold,
+        output_path=str(artifact_store.path(artifact_id, f"optimized_part{extension}")),
+        method=request.optimization.mesh_method,
+        file_format=request.optimization.output_format,
+    )
+    timer.update(stl_gen.timings.as_dict())
+
+    # Étape 5: Calculer métriques finales
+    with timer.phase("metrics"):
         geo_metrics = stl_gen.calculate_metrics(
             threshold=request.optimization.density_threshold
         )
-        
-        # Calculer masse
-        volume_m3 = geo_metrics['volume_optimized'] / 1e9  # mm³ -> m³
-        mass_kg = volume_m3 * request.material.density
-        
-        # Combiner toutes les métriques
-        final_metrics = {
-            **geo_metrics,
-            **simp_metrics,
-            'mass_kg': round(mass_kg, 3),
-            'mass_g': round(mass_kg * 1000, 1),
-        }
-        
-        # URL publique du fichier STL
-        filename = os.path.basename(stl_path)
-        stl_url = f"/api/download/{filename}"
-        
-        print(f"\n{'='*60}")
-        print(f"✅ OPTIMISATION TERMINÉE")
-        print(f"{'='*60}")
-        print(f"Volume initial: {geo_metrics['volume_initial']:.0f} mm³")
-        print(f"Volume optimisé: {geo_metrics['volume_optimized']:.0f} mm³")
-        print(f"Réduction: {geo_metrics['volume_reduction']:.1f}%")
-        print(f"Masse: {mass_kg*1000:.1f} g")
-        print(f"Fichier STL: {stl_path}")
-        print(f"{'='*60}\n")
-        
-        return OptimizationResponse(
+
+    # Calculer masse
+    volume_m3 = geo_metrics['volume_optimized'] / 1e9  # mm³ -> m³
+    mass_kg = volume_m3 * request.material.density
+
+    # Combiner toutes les métriques
+    final_metrics = {
+        **geo_metrics,
+        **simp_metrics,
+        'mass_kg': round(mass_kg, 3),
+        'mass_g': round(mass_kg * 1000, 1),
+    }
+
+    # URL publique du fichier STL
+    stl_url = artifact_store.url(artifact_id, os.path.basename(stl_path))
+
+    print(f"\n{'='*60}")
+    print(f"✅ OPTIMISATION TERMINÉE")
+    print(f"{'='*60}")
+    print(f"Volume initial: {geo_metrics['volume_initial']:.0f} mm³")
+    print(f"Volume optimisé: {geo_metrics['volume_optimized']:.0f} mm³")
+    print(f"Réduction: {geo_metrics['volume_reduction']:.1f}%")
+    print(f"Masse: {mass_kg*1000:.1f} g")
+    print(f"Fichier STL: {stl_path}")
+    print(f"{'='*60}\n")
+
+    with timer.phase("serialization"):
+        response = OptimizationResponse(
             success=True,
             stl_url=stl_url,
             metrics=final_metrics,
-            density_field=optimizer.get_density_field(),  # Optionnel
+            density_field=_density_payload(density_field, request.optimization, artifact_id),
+            artifact_id=artifact_id,
             message="Optimisation SIMP terminée avec succès"
-        )
-        
+        ).model_dump()
+    response["metrics"]["timings"] = timer.as_dict()
+    response["metrics"]["pipeline_seconds"] = round(time.perf_counter() - pipeline_start, 3)
+
+    if cache_key is not None:
+        # Le maillage en cache est servi par /api/optimize/cache/{key}/mesh
+        # (les artefacts du job peuvent expirer avant l'entrée de cache)
+        with timer.phase("cache_write"):
+            result_cache.write_entry(
+                cache_key,
+                {**response, "stl_url": f"/api/optimize/cache/{cache_key}/mesh", "artifact_id": None},
+                stl_path,
+                density=density_field,
+            )
+        response["metrics"]["timings"] = timer.as_dict()
+
+    return response
+
+
+def _cached_response(key: str, params: OptimizationParams) -> Optional[dict]:
+    cached = result_cache.get(key)
+    if cached is None:
+        return None
+    print(f"♻️ Résultat en cache ({key[:12]})")
+    log_event("optimization_cache_hit", key=key[:12])
+    density = result_cache.load_density(key)
+    if density is not None:
+        cached["density_field"] = _density_payload(density, params, key)
+    cached["metrics"]["cache_hit"] = True
+    cached["message"] = "Optimisation SIMP (résultat en cache)"
+    return cached
+
+
+def _profiling(token: Optional[str]) -> bool:
+    try:
+        return profiling_requested(token)
+    except ProfilingForbiddenError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+def _submit_job(request: OptimizationRequest, profile: bool = False):
+    """
+    Soumet une optimisation au pool de processus (503 si la file est pleine)
+    Une requête identique déjà calculée donne un job immédiatement terminé
+    (sauf requête profilée: le calcul est toujours exécuté, sans cache)
+    """
+    key = None
+    if request.optimization.use_cache and result_cache.enabled and not profile:
+        key = cache_key(request)
+        cached = _cached_response(key, request.optimization)
+        if cached is not None:
+            return job_manager.completed(cached)
+    options = {"cache_key": key}
+    if profile:
+        options["profile"] = True
+    try:
+        job = job_manager.submit(run_optimization, request.model_dump(), **options)
+    except QueueFullError as e:
+        optimization_jobs.inc(status="rejected")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    if key is not None:
+        job.future.add_done_callback(lambda _: result_cache.register(key))
+    job.future.add_done_callback(lambda _: _record_job(job))
+    return job
+
+
+def _record_job(job):
+    """Métriques et log structuré d'un job terminé (processus principal)"""
+    status = job.status
+    optimization_jobs.inc(status=status)
+    if status != "completed":
+        log_event("optimization_job", job_id=job.id, status=status)
+        return
+    metrics = job.future.result()["metrics"]
+    timings = metrics.get("timings", {})
+    for phase, entry in timings.items():
+        optimization_phase_duration.observe(entry["seconds"], phase=phase)
+    optimization_iterations.inc(metrics.get("iterations_completed", 0), solver=metrics.get("solver"))
+    log_event(
+        "optimization_job",
+        job_id=job.id,
+        status=status,
+        solver=metrics.get("solver"),
+        grid_shape=metrics.get("grid_shape"),
+        iterations=metrics.get("iterations_completed"),
+        stop_reason=metrics.get("stop_reason"),
+        pipeline_seconds=metrics.get("pipeline_seconds"),
+        timings={phase: entry["seconds"] for phase, entry in timings.items()},
+    )
+
+
+def _get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job introuvable")
+    return job
+
+
+@router.post("/optimize", response_model=OptimizationResponse)
+async def optimize_topology(
+    request: OptimizationRequest,
+    x_profile_token: Optional[str] = Header(default=None),
+):
+    """
+    Optimise la topologie d'une pièce avec l'algorithme SIMP (synchrone)
+    Soumet un job et attend son résultat sans bloquer l'event loop
+    Avec X-Profile-Token (= PROFILING_TOKEN), le calcul est profilé (profile_url)
+    """
+    job = _submit_job(request, profile=_profiling(x_profile_token))
+    try:
+        return await job_manager.wait(job)
+    except JobCancelledError:
+        raise HTTPException(status_code=409, detail="Optimisation annulée")
     except Exception as e:
         print(f"\n❌ ERREUR: {str(e)}\n")
         raise HTTPException(
@@ -201,19 +546,99 @@ async def optimize_topology(request: OptimizationRequest):
         )
 
 
-@router.get("/download/{filename}")
-async def download_stl(filename: str):
+@router.post("/optimize/jobs", status_code=202)
+async def submit_optimization_job(
+    request: OptimizationRequest,
+    x_profile_token: Optional[str] = Header(default=None),
+):
     """
-    Télécharge un fichier STL généré
+    Soumet une optimisation en arrière-plan
+    Retourne l'identifiant du job à interroger via GET /api/optimize/jobs/{job_id}
     """
-    temp_dir = Path(os.path.expanduser("~")) / "temp" / "topology_optimization"
-    file_path = temp_dir / filename
-    
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Fichier STL introuvable")
-    
-    return FileResponse(
-        path=str(file_path),
+    job = _submit_job(request, profile=_profiling(x_profile_token))
+    return job.to_dict()
+
+
+@router.get("/optimize/jobs/{job_id}")
+async def get_optimization_job(job_id: str):
+    """
+    Statut d'un job (queued, running, completed, failed, cancelled)
+    Contient le résultat (OptimizationResponse) une fois terminé
+    """
+    return _get_job(job_id).to_dict()
+
+
+@router.get("/optimize/jobs/{job_id}/events")
+async def stream_optimization_job(job_id: str, last_event_id: Optional[str] = Header(default=None)):
+    """
+    Flux Server-Sent Events de la progression d'un job
+    Un événement "progress" par itération SIMP (iteration, compliance,
+    volume_fraction, elapsed, aperçu "density" optionnel), puis un événement
+    final "completed", "failed" ou "cancelled"
+    """
+    job = _get_job(job_id)
+    start = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_stream():
+        async for event_id, name, data in job_manager.stream_events(job, last_id=start):
+            yield f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/optimize/jobs/{job_id}")
+async def cancel_optimization_job(job_id: str):
+    """Annule un job en attente ou en cours"""
+    _get_job(job_id)
+    return job_manager.cancel(job_id).to_dict(include_result=False)
+
+
+@router.get("/optimize/cache")
+async def optimization_cache_stats():
+    """Statistiques du cache de résultats (entrées, taille, hits, misses)"""
+    return result_cache.stats()
+
+
+@router.get("/optimize/density/{ref}")
+async def download_density(
+    ref: str,
+    dtype: Literal["uint8", "float16", "float32"] = "float32",
+    downsample: int = Query(default=1, ge=1),
+):
+    """
+    Champ de densité brut (C-order, little-endian) d'un job ou d'un résultat en cache
+    Forme et type dans les en-têtes X-Density-Shape / X-Density-Dtype; uint8: densité = valeur / 255
+    """
+    density = artifact_store.load_density(ref)
+    if density is None:
+        density = result_cache.load_density(ref)
+    if density is None:
+        raise HTTPException(status_code=404, detail="Champ de densité introuvable")
+    values = quantize_density(downsample_density(np.asarray(density), downsample), dtype)
+    return Response(
+        content=values.tobytes(),
         media_type="application/octet-stream",
-        filename=filename
+        headers={
+            "X-Density-Shape": ",".join(str(n) for n in values.shape),
+            "X-Density-Dtype": values.dtype.name,
+        },
+    )
+
+
+@router.get("/optimize/cache/{key}/mesh")
+async def download_cached_mesh(
+    key: str,
+    accept_encoding: Optional[str] = Header(default=None),
+    range: Optional[str] = Header(default=None),
+):
+    """Télécharge le maillage (STL, 3MF, OBJ, PLY) d'un résultat en cache"""
+    path = result_cache.mesh_path(key)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    return file_download(
+        path, MEDIA_TYPES[path.suffix], f"optimized_part{path.suffix}", accept_encoding, range
     )
@@ -2,14 +2,151 @@
 Algorithme SIMP (Solid Isotropic Material with Penalization)
 pour l'optimisation topologique
 """
+import time
+from functools import lru_cache
+
 import numpy as np
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import gaussian_filter, zoom
+from scipy.optimize import brentq
+
+from app.density_filter import cone_filter, heaviside_projection
+from app.fea_solver import FE_SOLVERS, HexFEModel
+from app.telemetry import PhaseTimer
+
+# Voxels minimum par axe d'un niveau grossier (optimize_multilevel): en dessous,
+# la zone chargée et le filtre (1.5 voxel) couvrent toute l'épaisseur
+MIN_LEVEL_ELEMENTS = 4
+
+
+def _boundary_masks(shape: tuple, load_zone: tuple, fixed_faces: tuple):
+    """
+    Construit les masques booléens des zones fixes et de la zone chargée
+    """
+    fixed_nodes = np.zeros(shape, dtype=bool)
+
+    if 'bottom' in fixed_faces:
+        fixed_nodes[:, :, 0] = True  # Base fixée
+    if 'top' in fixed_faces:
+        fixed_nodes[:, :, -1] = True
+    if 'left' in fixed_faces:
+        fixed_nodes[0, :, :] = True
+    if 'right' in fixed_faces:
+        fixed_nodes[-1, :, :] = True
+
+    x0, x1, y0, y1 = load_zone
+    load_nodes = np.zeros(shape, dtype=bool)
+    load_nodes[x0:x1, y0:y1, -1] = True
+
+    return fixed_nodes, load_nodes
+
+
+@lru_cache(maxsize=16)
+def _base_sensitivity_field(shape: tuple, load_zone: tuple, fixed_faces: tuple):
+    """
+    Champ de sensibilité de base (indépendant de la densité)
+
+    Ne dépend que de la grille et des zones chargées/fixes : calculé une seule
+    fois par broadcasting NumPy puis partagé entre les requêtes (cache LRU).
+    Le tableau retourné est en lecture seule.
+    """
+    nx, ny, nz = shape
+    fixed_nodes, load_nodes = _boundary_masks(shape, load_zone, fixed_faces)
+
+    # Propagation de contrainte (approximation): distance au centre du dessus
+    i, j, k = np.ogrid[0:nx, 0:ny, 0:nz]
+    dist_to_load = np.sqrt(
+        (i - nx / 2) ** 2 +
+        (j - ny / 2) ** 2 +
+        (k - nz) ** 2
+    )
+
+    # Sensibilité diminue avec distance (valeurs négatives)
+    base = -np.maximum(0.1, 1 / (1 + dist_to_load * 0.1))
+    base[fixed_nodes] = -0.8  # Zones fixes importantes
+    base[load_nodes] = -1.0  # NÉGATIF
+
+    base.setflags(write=False)
+    return base
+
+
+def grid_shape(
+    dimensions: tuple,
+    resolution: int = 25,
+    voxel_size: float = None,
+    voxel_budget: int = None,
+) -> tuple:
+    """
+    Nombre de voxels par axe (nx, ny, nz) pour des voxels quasi cubiques
+
+    Args:
+        dimensions: (length, width, height) en mm
+        resolution: Grille cubique resolution³ si ni voxel_size ni voxel_budget
+        voxel_size: Taille cible d'un voxel en mm
+        voxel_budget: Nombre total de voxels visé (prioritaire sur voxel_size)
+
+    Returns:
+        (nx, ny, nz), au moins 1 voxel par axe
+    """
+    if voxel_budget is None and voxel_size is None:
+        return resolution, resolution, resolution
+
+    lengths = np.asarray(dimensions[:3], dtype=float)
+    if voxel_budget is not None:
+        if voxel_budget < 1:
+            raise ValueError("voxel_budget doit être >= 1")
+        voxel_size = (np.prod(lengths) / voxel_budget) ** (1 / 3)
+    elif voxel_size <= 0:
+        raise ValueError("voxel_size doit être > 0")
+
+    counts = np.maximum(1, np.round(lengths / voxel_size)).astype(int)
+
+    # L'arrondi peut dépasser le budget: retirer une couche sur l'axe aux voxels les plus fins
+    if voxel_budget is not None:
+        while np.prod(counts) > voxel_budget and counts.max() > 1:
+            counts[np.argmin(np.where(counts > 1, lengths / counts, np.inf))] -= 1
+
+    return tuple(int(n) for n in counts)
+
+
+def downsample_density(density: np.ndarray, factor: int) -> np.ndarray:
+    """Réduit le champ de densité par moyenne sur des blocs factor³ (blocs partiels aux bords)"""
+    if factor <= 1:
+        return density
+    for axis, n in enumerate(density.shape):
+        starts = np.arange(0, n, factor)
+        counts = np.minimum(factor, n - starts)
+        density = np.add.reduceat(density, starts, axis=axis)
+        density = density / counts.reshape([-1 if a == axis else 1 for a in range(3)])
+    return density
+
+
+def upsample_density(density: np.ndarray, shape: tuple) -> np.ndarray:
+    """Interpolation trilinéaire (scipy.ndimage.zoom) du champ vers la grille shape"""
+    factors = [n / m for n, m in zip(shape, density.shape)]
+    upsampled = zoom(density, factors, order=1, mode='nearest', grid_mode=True)
+    return np.clip(upsampled, 0.001, 1.0)
 
 
 class SIMPOptimizer:
     """
     Implémentation simplifiée de l'algorithme SIMP
     Contrainte: 4GB RAM - optimisé pour résolutions moyennes (30x30x30 max)
+
+    Solveurs disponibles:
+    - "fast": FEA heuristique (sensibilité approchée, très rapide)
+    - "sparse": vraie FEA hexaédrique assemblée (scipy.sparse + PCG), 30³-50³
+    - "matrix_free": vraie FEA sans matrice globale (élément par élément),
+      pour les grilles fines 80³-100³
+
+    Les solveurs FE utilisent un préconditionneur multigrille géométrique
+    (ou Jacobi) et démarrent chaque résolution à chaud depuis les
+    déplacements de l'itération précédente.
+
+    Filtres (rayon rmin en mm, voir app.density_filter):
+    - "sensitivity": filtre en cône des sensibilités (Sigmund)
+    - "density": filtre en cône des densités, suivi d'une projection de
+      Heaviside si projection_beta est fourni (moins de voxels gris)
+    - "gaussian": ancien lissage gaussien des sensibilités
     """
     
     def __init__(
@@ -18,17 +155,46 @@ class SIMPOptimizer:
         resolution: int = 25,  # Grille 3D
         volume_fraction: float = 0.4,  # 40% du volume initial
         penal: float = 3.0,  # Pénalité SIMP
-        rmin: float = 1.5,  # Rayon du filtre
+        rmin: float = None,  # Rayon du filtre en mm (défaut: 1.5 voxel)
+        voxel_size: float = None,  # mm, grille anisotrope (remplace resolution)
+        voxel_budget: int = None,  # Nombre total de voxels (remplace resolution)
+        solver: str = "fast",  # "fast" (heuristique) ou clé de FE_SOLVERS
+        preconditioner: str = "multigrid",  # "jacobi" ou "multigrid" (solveurs FE)
+        youngs_modulus: float = 1.0,  # Pa
+        poisson_ratio: float = 0.3,
+        filter_type: str = "sensitivity",  # "sensitivity", "density" ou "gaussian"
+        projection_beta: float = None,  # Raideur de la projection (filtre de densité)
+        projection_eta: float = 0.5,  # Seuil de la projection
     ):
+        if solver != "fast" and solver not in FE_SOLVERS:
+            raise ValueError(f"Solveur inconnu: {solver}")
+        if filter_type not in ("sensitivity", "density", "gaussian"):
+            raise ValueError(f"Filtre inconnu: {filter_type}")
+        if projection_beta is not None and filter_type != "density":
+            raise ValueError("La projection de Heaviside requiert filter_type='density'")
+
         self.dimensions = dimensions
         self.resolution = resolution
         self.volume_fraction = volume_fraction
         self.penal = penal
-        self.rmin = rmin
+        self.solver = solver
+        self.filter_type = filter_type
+        self.projection_beta = projection_beta
+        self.projection_eta = projection_eta
+        self.preconditioner = preconditioner
+        # Unités cohérentes avec les mm: E en N/mm² (MPa), compliance en N.mm
+        self.E0 = youngs_modulus / 1e6
+        self.Emin = self.E0 * 1e-9  # Rigidité résiduelle des zones vides
+        self.poisson_ratio = poisson_ratio if poisson_ratio is not None else 0.3
         
-        # Grille 3D de densité (0=vide, 1=plein)
-        self.nx, self.ny, self.nz = resolution, resolution, resolution
+        # Grille 3D de densité (0=vide, 1=plein), voxels quasi cubiques si
+        # voxel_size / voxel_budget sont fournis (pièces élancées ou plates)
+        self.nx, self.ny, self.nz = grid_shape(dimensions, resolution, voxel_size, voxel_budget)
         self.density = np.ones((self.nx, self.ny, self.nz)) * volume_fraction
+        self.voxel_size = tuple(
+            float(length) / n for length, n in zip(dimensions[:3], (self.nx, self.ny, self.nz))
+        )
+        self.rmin = rmin if rmin is not None else 1.5 * min(self.voxel_size)
         
     def apply_loads_and_constraints(
         self,
@@ -39,45 +205,114 @@ class SIMPOptimizer:
         """
         Applique les charges et contraintes au modèle
         """
-        # Identifier les zones fixes (conditions limites)
-        self.fixed_nodes = np.zeros((self.nx, self.ny, self.nz), dtype=bool)
-        
-        if 'bottom' in fixed_faces:
-            self.fixed_nodes[:, :, 0] = True  # Base fixée
-        if 'top' in fixed_faces:
-            self.fixed_nodes[:, :, -1] = True
-        if 'left' in fixed_faces:
-            self.fixed_nodes[0, :, :] = True
-        if 'right' in fixed_faces:
-            self.fixed_nodes[-1, :, :] = True
-            
+        shape = (self.nx, self.ny, self.nz)
+
         # Zone de chargement (centre du dessus par défaut)
-        self.load_nodes = np.zeros((self.nx, self.ny, self.nz), dtype=bool)
+        # (bornée à la grille: les grilles grossières peuvent avoir moins de 5 voxels par axe)
         center_x, center_y = self.nx // 2, self.ny // 2
-        self.load_nodes[center_x-2:center_x+2, center_y-2:center_y+2, -1] = True
+        load_zone = (
+            max(0, center_x - 2), min(self.nx, center_x + 2),
+            max(0, center_y - 2), min(self.ny, center_y + 2),
+        )
+        faces_key = tuple(sorted(set(fixed_faces)))
+
+        # Identifier les zones fixes (conditions limites) et la zone chargée
+        self.fixed_nodes, self.load_nodes = _boundary_masks(shape, load_zone, faces_key)
+        self.fixed_faces = faces_key
+
+        # Sensibilité de base: calculée une fois (cache partagé entre requêtes)
+        self._base_sensitivity = _base_sensitivity_field(shape, load_zone, faces_key)
         
         self.force_magnitude = force_magnitude
         self.force_direction = np.array(force_direction)
+
+        # Modèle éléments finis (connectivité, encastrements, forces nodales)
+        if self.solver != "fast":
+            element_size = (
+                self.dimensions[0] / self.nx,
+                self.dimensions[1] / self.ny,
+                self.dimensions[2] / self.nz,
+            )
+            self._fe_model = HexFEModel(
+                shape, element_size, self.poisson_ratio, faces_key,
+                self.load_nodes, force_magnitude, self.force_direction,
+            )
+            self._fe_solver = FE_SOLVERS[self.solver](
+                self._fe_model, preconditioner=self.preconditioner
+            )
+            # Déplacements de l'itération précédente (démarrage à chaud du PCG)
+            self._displacement = None
         
-    def optimize(self, iterations: int = 50):
+    def optimize(
+        self,
+        iterations: int = 50,
+        max_density_change: float = None,
+        compliance_tol: float = None,
+        compliance_window: int = 5,
+        time_limit: float = None,
+        progress_callback=None,
+    ):
         """
         Exécute l'algorithme SIMP
         Retourne: champ de densité final + métriques
+
+        progress_callback(event) est appelé à chaque itération avec un dict
+        {iteration, iterations, compliance, volume_fraction, elapsed}; il peut
+        lever une exception pour interrompre l'optimisation (annulation).
+
+        metrics['timings'] donne, par phase (fea, filter, oc_update,
+        convergence, progress), la durée cumulée en secondes et le nombre de
+        passages.
+
+        Critères d'arrêt anticipé (désactivés si None):
+            max_density_change: arrêt si max|x_new - x| passe sous ce seuil
+            compliance_tol: arrêt si la variation relative de compliance
+                (max - min) / |moyenne| sur les compliance_window dernières
+                itérations passe sous ce seuil
+            time_limit: budget de temps en secondes (arrêt avant de le dépasser)
         """
-        print(f"🚀 Démarrage SIMP: {iterations} itérations, résolution {self.resolution}³")
+        print(f"🚀 Démarrage SIMP: {iterations} itérations, grille {self.nx}x{self.ny}x{self.nz}, solveur {self.solver}")
         
         compliance_history = []
         volume_history = []
+        self._solve_history = []
+        # Durée cumulée et nombre de passages de chaque phase de l'itération
+        timer = PhaseTimer()
+        stop_reason = 'max_iterations'
+        start_time = time.perf_counter()
+
+        # Filtre de densité: les variables de conception (design) diffèrent de
+        # la densité physique self.density = projection(filtre(design))
+        projection_gradient = None
+        if self.filter_type == "density":
+            design = self.density
+            self.density, projection_gradient = self._physical_density(design)
         
         for iteration in range(iterations):
-            # 1. Analyse par éléments finis (FEA simplifiée)
-            compliance, sensitivity = self._simplified_fea()
+            # 1. Analyse par éléments finis (heuristique ou FEA réelle)
+            with timer.phase('fea'):
+                if self.solver == "fast":
+                    compliance, sensitivity = self._simplified_fea()
+                else:
+                    compliance, sensitivity = self._finite_element_analysis()
             
             # 2. Filtrer les sensibilités (éviter le damier)
-            sensitivity_filtered = gaussian_filter(sensitivity, sigma=self.rmin)
+            with timer.phase('filter'):
+                sensitivity_filtered = self._filter_sensitivity(sensitivity, projection_gradient)
             
             # 3. Mise à jour des densités (OC - Optimality Criteria)
-            self.density = self._update_density(sensitivity_filtered)
+            previous_density = self.density
+            with timer.phase('oc_update'):
+                if self.filter_type == "density":
+                    # Contrainte de volume sur la densité physique (filtrée, projetée)
+                    design = self._update_density(
+                        sensitivity_filtered, design,
+                        volume=lambda candidate: self._physical_density(candidate)[0].mean(),
+                    )
+                    design[self.fixed_nodes] = 1.0
+                    self.density, projection_gradient = self._physical_density(design)
+                else:
+                    self.density = self._update_density(sensitivity_filtered)
             
             # 4. Appliquer les contraintes (zones fixes toujours pleines)
             self.density[self.fixed_nodes] = 1.0
@@ -89,18 +324,189 @@ class SIMPOptimizer:
             
             if iteration % 10 == 0:
                 print(f"  Iter {iteration}: Compliance={compliance:.4f}, Volume={current_volume:.2%}")
+
+            if progress_callback is not None:
+                with timer.phase('progress'):
+                    progress_callback({
+                        'iteration': iteration,
+                        'iterations': iterations,
+                        'compliance': float(compliance),
+                        'volume_fraction': float(current_volume),
+                        'elapsed': round(time.perf_counter() - start_time, 3),
+                    })
+
+            # 6. Critères d'arrêt anticipé
+            with timer.phase('convergence'):
+                stop_reason = self._convergence_reason(
+                    previous_density, compliance_history, start_time, iteration + 1,
+                    max_density_change, compliance_tol, compliance_window, time_limit,
+                )
+            if stop_reason is not None:
+                print(f"  ⏹️ Arrêt anticipé à l'itération {iteration}: {stop_reason}")
+                break
+        else:
+            stop_reason = 'max_iterations'
         
         print(f"✅ Optimisation terminée !")
         
         metrics = {
             'final_compliance': float(compliance_history[-1]),
             'final_volume_fraction': float(volume_history[-1]),
-            'iterations_completed': iterations,
+            'iterations_completed': len(compliance_history),
+            'stop_reason': stop_reason,
+            'elapsed_seconds': round(time.perf_counter() - start_time, 3),
+            'grid_shape': [self.nx, self.ny, self.nz],
+            'solver': self.solver,
+            'filter_type': self.filter_type,
+            'filter_radius_mm': round(float(self.rmin), 4),
+            # Voxels ni vides ni pleins (à trancher par le seuil d'export)
+            'grey_fraction': float(np.mean((self.density > 0.1) & (self.density < 0.9))),
             'compliance_history': [float(c) for c in compliance_history],
+            'timings': timer.as_dict(),
         }
+
+        if self._solve_history:
+            # Statistiques du solveur FE: itérations PCG et résidu final par itération SIMP
+            metrics.update({
+                'preconditioner': self.preconditioner,
+                'solver_iterations': [info['iterations'] for info in self._solve_history],
+                'solver_residuals': [float(info['residual']) for info in self._solve_history],
+                'total_solver_iterations': int(sum(info['iterations'] for info in self._solve_history)),
+            })
         
         return self.density, metrics
     
+    def optimize_multilevel(
+        self,
+        levels: list,
+        iterations: int = 50,
+        time_limit: float = None,
+        progress_callback=None,
+        **criteria,
+    ):
+        """
+        Continuation grossier -> fin: optimise d'abord sur des grilles réduites
+        (chemin d'effort trouvé à moindre coût), puis interpole la densité
+        (upsample_density) comme point de départ du niveau suivant; seules
+        `iterations` itérations sont faites à pleine résolution
+
+        Args:
+            levels: [(scale, iterations), ...] niveaux grossiers, facteur de la
+                grille par axe (0 < scale < 1), exécutés du plus grossier au plus fin;
+                un niveau qui laisserait moins de MIN_LEVEL_ELEMENTS voxels sur un
+                axe (pièce élancée) est ignoré
+            time_limit: budget total en secondes, partagé entre les niveaux
+            criteria: critères d'arrêt de optimize, appliqués à chaque niveau
+
+        Les événements de progression portent 'level' et 'levels'. Les
+        métriques sont celles du niveau final, plus 'levels' (grille,
+        itérations, durée, compliance et phases de chaque niveau) et
+        'timings' cumulés sur tous les niveaux (dont 'upsample').
+        """
+        fine_shape = (self.nx, self.ny, self.nz)
+        fine_rmin = self.rmin
+        schedule = []
+        for scale, level_iterations in sorted(levels, key=lambda level: level[0]):
+            shape = tuple(int(round(n * scale)) for n in fine_shape)
+            if any(c < min(MIN_LEVEL_ELEMENTS, n) for c, n in zip(shape, fine_shape)):
+                print(f"⚠️ Niveau ×{scale} ignoré: grille {shape[0]}x{shape[1]}x{shape[2]} trop grossière")
+                continue
+            schedule.append((scale, level_iterations, shape))
+        schedule.append((1.0, iterations, fine_shape))
+        timer = PhaseTimer()
+        reports = []
+        start_time = time.perf_counter()
+
+        try:
+            for index, (scale, level_iterations, shape) in enumerate(schedule):
+                if shape != (self.nx, self.ny, self.nz):
+                    if reports:
+                        with timer.phase('upsample'):
+                            self._set_grid(shape, upsample_density(self.density, shape))
+                    else:
+                        self._set_grid(shape)
+                # Rayon d'au moins 1.5 voxel sur les grilles grossières (sinon pas de filtrage)
+                self.rmin = fine_rmin if shape == fine_shape else max(fine_rmin, 1.5 * min(self.voxel_size))
+
+                remaining = None
+                if time_limit is not None:
+                    remaining = max(0.0, time_limit - (time.perf_counter() - start_time))
+                callback = None
+                if progress_callback is not None:
+                    def callback(event, level=index):
+                        progress_callback({**event, 'level': level, 'levels': len(schedule)})
+
+                print(f"🔍 Niveau {index + 1}/{len(schedule)}: grille {shape[0]}x{shape[1]}x{shape[2]}")
+                density, metrics = self.optimize(
+                    iterations=level_iterations,
+                    time_limit=remaining,
+                    progress_callback=callback,
+                    **criteria,
+                )
+                timer.update(metrics['timings'])
+                reports.append({
+                    'level': index,
+                    'scale': float(scale),
+                    'grid_shape': list(shape),
+                    'iterations_completed': metrics['iterations_completed'],
+                    'stop_reason': metrics['stop_reason'],
+                    'final_compliance': metrics['final_compliance'],
+                    'elapsed_seconds': metrics['elapsed_seconds'],
+                    'timings': metrics['timings'],
+                })
+        finally:
+            self.rmin = fine_rmin
+
+        metrics.update({
+            'levels': reports,
+            'total_iterations': sum(report['iterations_completed'] for report in reports),
+            'elapsed_seconds': round(time.perf_counter() - start_time, 3),
+            'timings': timer.as_dict(),
+        })
+        return density, metrics
+
+    def _set_grid(self, shape: tuple, density: np.ndarray = None):
+        """Change la grille (niveau multi-résolution) et reconstruit charges et modèle FE"""
+        self.nx, self.ny, self.nz = shape
+        self.voxel_size = tuple(
+            float(length) / n for length, n in zip(self.dimensions[:3], shape)
+        )
+        self.density = density if density is not None else np.full(shape, self.volume_fraction)
+        if getattr(self, 'force_magnitude', None) is not None:
+            self.apply_loads_and_constraints(
+                self.force_magnitude, self.force_direction, list(self.fixed_faces)
+            )
+
+    def _convergence_reason(
+        self,
+        previous_density,
+        compliance_history,
+        start_time,
+        completed,
+        max_density_change,
+        compliance_tol,
+        compliance_window,
+        time_limit,
+    ):
+        """Retourne le critère d'arrêt déclenché, ou None pour continuer"""
+        if max_density_change is not None:
+            if np.max(np.abs(self.density - previous_density)) < max_density_change:
+                return 'density_change'
+
+        if compliance_tol is not None and len(compliance_history) >= compliance_window:
+            window = compliance_history[-compliance_window:]
+            spread = max(window) - min(window)
+            if spread <= compliance_tol * abs(np.mean(window)):
+                return 'compliance_change'
+
+        if time_limit is not None:
+            # Arrêter si l'itération suivante (durée moyenne) dépasserait le budget
+            elapsed = time.perf_counter() - start_time
+            if elapsed + elapsed / completed > time_limit:
+                return 'time_budget'
+
+        return None
+
     def _simplified_fea(self):
         """
         Analyse par éléments finis simplifiée
@@ -115,82 +521,147 @@ class SIMPOptimizer:
         # Sensibilité: gradient de compliance par rapport à la densité
         # IMPORTANT: doit être NÉGATIF pour l'algorithme OC
         # Plus une zone est sollicitée, plus sa sensibilité (en valeur absolue) est élevée
-        sensitivity = np.zeros_like(self.density)
-        
-        # Simuler sensibilité élevée près des charges et zones fixes
-        for i in range(self.nx):
-            for j in range(self.ny):
-                for k in range(self.nz):
-                    # Distance aux nœuds chargés
-                    if self.load_nodes[i, j, k]:
-                        sensitivity[i, j, k] = -1.0  # NÉGATIF
-                    elif self.fixed_nodes[i, j, k]:
-                        sensitivity[i, j, k] = -0.8  # Zones fixes importantes
-                    else:
-                        # Propagation de contrainte (approximation)
-                        dist_to_load = np.sqrt(
-                            (i - self.nx/2)**2 + 
-                            (j - self.ny/2)**2 + 
-                            (k - self.nz)**2
-                        )
-                        
-                        # Sensibilité diminue avec distance (valeurs négatives)
-                        sensitivity[i, j, k] = -max(0.1, 1 / (1 + dist_to_load * 0.1))
+        # Sensibilité élevée près des charges et zones fixes: champ de base
+        # précalculé dans apply_loads_and_constraints (voir _base_sensitivity_field)
         
         # Pondérer par la densité actuelle et la pénalité SIMP
         # Protection contre division par zéro avec densités très faibles
         density_safe = np.maximum(self.density, 1e-6)
-        sensitivity *= -self.penal * (density_safe ** (self.penal - 1))
+        sensitivity = self._base_sensitivity * (-self.penal * (density_safe ** (self.penal - 1)))
         
         return compliance, sensitivity
     
-    def _update_density(self, sensitivity):
+    def _finite_element_analysis(self):
+        """
+        Analyse par éléments finis hexaédriques (8 nœuds)
+        Compliance réelle C = F^T u et sensibilité exacte dC/dx
+        """
+        density_penal = self.density ** self.penal
+        stiffness = self.Emin + density_penal.ravel() * (self.E0 - self.Emin)
+
+        # Démarrage à chaud: la densité change peu d'une itération à l'autre
+        u, info = self._fe_solver.solve(stiffness, x0=self._displacement)
+        self._displacement = u
+        self._solve_history.append(info)
+
+        # Énergie élémentaire u_e^T KE u_e (KE calculée pour E=1)
+        element_energy = self._fe_model.element_energy(u).reshape(self.density.shape)
+        compliance = float(self._fe_model.force @ u)
+
+        # dC/dx_e = -p x_e^(p-1) (E0 - Emin) u_e^T KE u_e  (toujours négatif)
+        sensitivity = (
+            -self.penal * (self.E0 - self.Emin)
+            * self.density ** (self.penal - 1) * element_energy
+        )
+
+        return compliance, sensitivity
+    
+    def _filter_sensitivity(self, sensitivity, projection_gradient=None):
+        """
+        Filtre des sensibilités selon filter_type
+        "density": dérivée en chaîne à travers la projection puis le filtre
+        """
+        if self.filter_type == "gaussian":
+            sigma = tuple(self.rmin / h for h in self.voxel_size)
+            return gaussian_filter(sensitivity, sigma=sigma)
+        density_filter = self._cone_filter()
+        if self.filter_type == "sensitivity":
+            # dC/dx filtré = H(x dC/dx) / (Hs max(1e-3, x))
+            return density_filter.apply(self.density * sensitivity) / np.maximum(1e-3, self.density)
+        if projection_gradient is not None:
+            sensitivity = sensitivity * projection_gradient
+        return density_filter.apply_transpose(sensitivity)
+
+    def _physical_density(self, design):
+        """Densité physique (filtre de densité, projection) et dérivée de la projection"""
+        density = self._cone_filter().apply(design)
+        gradient = None
+        if self.projection_beta is not None:
+            density, gradient = heaviside_projection(density, self.projection_beta, self.projection_eta)
+        if getattr(self, 'fixed_nodes', None) is not None:
+            density[self.fixed_nodes] = 1.0  # Zones fixes toujours pleines
+        return density, gradient
+
+    def _cone_filter(self):
+        # Poids précalculés, partagés par (grille, taille de voxel, rayon)
+        return cone_filter(
+            (self.nx, self.ny, self.nz),
+            tuple(round(h, 9) for h in self.voxel_size),
+            round(float(self.rmin), 9),
+        )
+    
+    def _update_density(self, sensitivity, design=None, volume=None):
         """
         Mise à jour OC (Optimality Criteria)
+
+        x_new(l) = clip(x * sqrt(-dC/dx / l), max(0.001, x - move), min(1, x + move))
+        Le volume moyen de x_new(l) décroît avec le multiplicateur de Lagrange l:
+        on l'encadre exactement (valeurs de l où chaque élément sature) puis on
+        résout volume(l) = volume_fraction par la méthode de Brent en log(l).
+        Toutes les évaluations travaillent dans des tampons préalloués (out=).
+
+        design: variables de conception x (défaut: self.density)
+        volume(x_new): volume contraint (défaut: moyenne de x_new), ex: volume
+        de la densité physique avec le filtre de densité
         """
         # Paramètres OC
         move = 0.2
-        
-        # Calculer le multiplicateur de Lagrange (bisection method)
-        l1, l2 = 1e-10, 1e9  # Éviter l1=0 pour éviter division par zéro
-        
-        # Protection contre boucle infinie
-        max_iterations = 100
-        iteration = 0
-        
-        while (l2 - l1) / (l1 + l2) > 1e-3 and iteration < max_iterations:
-            iteration += 1
-            lmid = 0.5 * (l2 + l1)
-            
-            # Protection contre division par zéro
-            if lmid < 1e-10:
-                lmid = 1e-10
-            
-            # Calculer nouvelle densité avec multiplicateur actuel
-            Be = -sensitivity / (lmid + 1e-10)  # Protection division par zéro
-            density_new = np.maximum(
-                0.001,
-                np.maximum(
-                    self.density - move,
-                    np.minimum(
-                        1.0,
-                        np.minimum(
-                            self.density + move,
-                            self.density * np.sqrt(np.maximum(Be, 1e-6))  # Éviter racine négative
-                        )
-                    )
-                )
-            )
-            
-            # Vérifier contrainte de volume
-            current_volume = np.mean(density_new)
-            
-            if current_volume > self.volume_fraction:
-                l1 = lmid
+
+        x = self.density if design is None else design
+        lower, upper, scale, density_new = self._oc_workspace(x)
+
+        # Bornes de la zone de mouvement
+        np.subtract(x, move, out=lower)
+        np.maximum(lower, 0.001, out=lower)
+        np.add(x, move, out=upper)
+        np.minimum(upper, 1.0, out=upper)
+
+        # x * sqrt(-dC/dx): seul facteur dépendant de la sensibilité
+        # (les sensibilités positives donnent x_new = borne basse, comme avant)
+        np.negative(sensitivity, out=scale)
+        np.maximum(scale, 0.0, out=scale)
+        np.sqrt(scale, out=scale)
+        scale *= x
+
+        def volume_excess(log_lmid):
+            np.multiply(scale, np.exp(-0.5 * log_lmid), out=density_new)
+            np.clip(density_new, lower, upper, out=density_new)
+            current = density_new.mean() if volume is None else volume(density_new)
+            return current - self.volume_fraction
+
+        # Encadrement: en dessous de l1 tout sature en haut, au-dessus de l2 tout sature en bas
+        np.divide(scale, lower, out=density_new)
+        l2 = density_new.max() ** 2
+        if l2 > 0:
+            np.divide(scale, upper, out=density_new)
+            l1 = density_new[density_new > 0].min() ** 2
+            log_l1, log_l2 = np.log(l1), np.log(l2)
+
+            if volume_excess(log_l1) <= 0:
+                log_lmid = log_l1  # Volume cible inatteignable: densité maximale
+            elif volume_excess(log_l2) >= 0:
+                log_lmid = log_l2  # Volume cible inatteignable: densité minimale
             else:
-                l2 = lmid
-        
-        return np.clip(density_new, 0.001, 1.0)
+                log_lmid = brentq(volume_excess, log_l1, log_l2, xtol=1e-6)
+            volume_excess(log_lmid)
+        else:
+            # Aucune sensibilité négative: toutes les densités à la borne basse
+            np.copyto(density_new, lower)
+
+        # Double tampon: l'ancien champ sert de tampon au prochain appel
+        self._oc_buffers[3] = x
+        return density_new
+
+    def _oc_workspace(self, x):
+        """Tampons de travail de la mise à jour OC, alloués une fois par forme de grille"""
+        buffers = getattr(self, '_oc_buffers', None)
+        if buffers is None or buffers[0].shape != x.shape:
+            buffers = [np.empty_like(x) for _ in range(4)]
+            self._oc_buffers = buffers
+        elif buffers[3] is x:
+            # Le résultat précédent n'a pas remplacé le champ courant: ne pas l'écraser
+            buffers[3] = np.empty_like(x)
+        return buffers
     
     def get_density_field(self):
         """Retourne le champ de densité final"""
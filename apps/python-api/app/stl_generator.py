@@ -1,17 +1,15 @@
 """
-Générateur de géométrie 3D avec Build123d
-Convertit le champ de densité SIMP en STL
+Générateur de géométrie 3D
+Convertit le champ de densité SIMP en STL (maillage surfacique vectorisé,
+marching cubes optionnel, ou fusion Build123d)
 """
 import numpy as np
-from pathlib import Path
-import tempfile
 import os
 
-# Build123d pour CAO paramétrique
-try:
-    from build123d import *
-except ImportError:
-    print("⚠️ Build123d non installé - fallback vers export brut")
+from app.artifacts import artifact_store
+from app.mesh_export import MESH_FORMATS
+from app.telemetry import PhaseTimer
+from app.voxel_mesh import greedy_surface_mesh, has_marching_cubes, isosurface_mesh, voxel_surface_mesh
 
 
 class STLGenerator:
@@ -23,6 +21,7 @@ class STLGenerator:
         """
         Args:
             density_field: Grille 3D numpy (nx, ny, nz) avec densités 0-1
+                (nombre de voxels propre à chaque axe, voir grid_shape)
             dimensions: (length, width, height) en mm
         """
         self.density = density_field
@@ -35,37 +34,83 @@ class STLGenerator:
             dimensions[1] / self.ny,
             dimensions[2] / self.nz,
         )
+        # Durées des phases d'export (mesh_extraction, mesh_write ou build123d)
+        self.timings = PhaseTimer()
     
-    def generate_stl(self, threshold: float = 0.5, output_path: str = None) -> str:
+    def generate_stl(
+        self,
+        threshold: float = 0.5,
+        output_path: str = None,
+        method: str = "surface",
+        file_format: str = "stl",
+    ) -> str:
         """
-        Génère un fichier STL à partir du champ de densité
+        Génère un fichier maillage (STL par défaut) à partir du champ de densité
         
         Args:
             threshold: Densité minimale pour considérer un voxel comme solide
-            output_path: Chemin de sortie (optionnel)
+            output_path: Chemin de sortie (par défaut: nouveau dossier d'artefacts)
+            method: "surface" (faces extérieures des voxels), "greedy" (faces
+                coplanaires fusionnées en rectangles), "marching_cubes"
+                (isosurface lisse, scikit-image) ou "build123d" (fusion B-rep, lent)
+            file_format: "stl", "3mf", "obj" ou "ply" (voir MESH_FORMATS)
         
         Returns:
-            Chemin du fichier STL généré
+            Chemin du fichier généré
         """
+        writer, extension, _ = MESH_FORMATS[file_format]
         if output_path is None:
-            temp_dir = Path(tempfile.gettempdir()) / "topology_optimization"
-            temp_dir.mkdir(exist_ok=True)
-            output_path = str(temp_dir / "optimized_part.stl")
+            artifact_id = artifact_store.create()
+            output_path = str(artifact_store.path(artifact_id, f"optimized_part{extension}"))
         
-        try:
-            # Méthode 1: Avec Build123d (préféré)
-            self._generate_with_build123d(threshold, output_path)
-        except Exception as e:
-            print(f"⚠️ Erreur Build123d: {e}")
-            # Méthode 2: Fallback - export simple de voxels
-            self._generate_simple_voxels(threshold, output_path)
+        if method == "build123d" and file_format != "stl":
+            print("⚠️ Build123d n'exporte que du STL - fallback vers maillage surfacique")
+            method = "surface"
+        if method == "build123d":
+            try:
+                with self.timings.phase("build123d"):
+                    self._generate_with_build123d(threshold, output_path)
+                return output_path
+            except Exception as e:
+                print(f"⚠️ Erreur Build123d: {e}")
+                method = "surface"
+        
+        with self.timings.phase("mesh_extraction"):
+            vertices, faces = self.extract_mesh(threshold, method)
+        with self.timings.phase("mesh_write"):
+            writer(vertices, faces, output_path)
+        print(f"✅ {file_format.upper()} généré ({len(vertices)} sommets, {len(faces)} triangles): {output_path}")
         
         return output_path
     
+    def extract_mesh(self, threshold: float = 0.5, method: str = "surface"):
+        """
+        Maillage surfacique (vertices en mm, faces triangulaires indexées)
+        
+        "surface": faces de voxels dont le voisin est vide (décalages NumPy)
+        "greedy": idem, faces coplanaires adjacentes fusionnées en rectangles
+        (découpés aux jonctions en T, maillage étanche)
+        "marching_cubes": isosurface à threshold, repli sur "surface" si
+        scikit-image n'est pas installé
+        """
+        if method == "greedy":
+            return greedy_surface_mesh(self.density >= threshold, self.voxel_size)
+        if method == "marching_cubes":
+            if has_marching_cubes():
+                return isosurface_mesh(self.density, threshold, self.voxel_size)
+            print("⚠️ scikit-image non installé - fallback vers maillage surfacique")
+        return voxel_surface_mesh(self.density >= threshold, self.voxel_size)
+    
     def _generate_with_build123d(self, threshold: float, output_path: str):
         """
-        Génère STL avec Build123d (lissage professionnel)
+        Génère STL avec Build123d (fusion de boxes, lent au-delà de ~20³ voxels)
         """
+        # Build123d (OpenCascade) importé à la première utilisation: plusieurs
+        # secondes et centaines de Mo évités au démarrage de l'API
+        try:
+            import build123d as bd
+        except ImportError:
+            raise ImportError("Build123d non installé")
         print("🔧 Génération STL avec Build123d...")
         
         # Créer une collection de boxes pour chaque voxel dense
@@ -81,25 +126,25 @@ class STLGenerator:
                         center_z = k * self.voxel_size[2] + self.voxel_size[2] / 2
                         
                         # Créer un cube à cette position
-                        with BuildPart() as box_part:
-                            Box(
+                        with bd.BuildPart() as box_part:
+                            bd.Box(
                                 self.voxel_size[0],
                                 self.voxel_size[1],
                                 self.voxel_size[2],
-                                align=(Align.CENTER, Align.CENTER, Align.CENTER)
+                                align=(bd.Align.CENTER, bd.Align.CENTER, bd.Align.CENTER)
                             )
                             # Déplacer au bon endroit
                             box_part.part.locate(
-                                Location((center_x, center_y, center_z))
+                                bd.Location((center_x, center_y, center_z))
                             )
                         
                         boxes.append(box_part.part)
         
         # Fusionner tous les voxels en une seule pièce
         if boxes:
-            with BuildPart() as final_part:
+            with bd.BuildPart() as final_part:
                 for box in boxes:
-                    add(box)
+                    bd.add(box)
             
             # Exporter en STL
             final_part.part.export_stl(output_path)
@@ -107,83 +152,6 @@ class STLGenerator:
         else:
             raise ValueError("Aucun voxel au-dessus du seuil de densité")
     
-    def _generate_simple_voxels(self, threshold: float, output_path: str):
-        """
-        Fallback: Export STL simple sans Build123d
-        Crée un fichier STL ASCII basique avec des cubes
-        """
-        print("🔧 Génération STL simple (fallback)...")
-        
-        vertices = []
-        faces = []
-        
-        # Pour chaque voxel dense, créer 8 vertices et 12 triangles (cube)
-        vertex_count = 0
-        
-        for i in range(self.nx):
-            for j in range(self.ny):
-                for k in range(self.nz):
-                    if self.density[i, j, k] >= threshold:
-                        # Coins du voxel
-                        x0, y0, z0 = (
-                            i * self.voxel_size[0],
-                            j * self.voxel_size[1],
-                            k * self.voxel_size[2],
-                        )
-                        x1 = x0 + self.voxel_size[0]
-                        y1 = y0 + self.voxel_size[1]
-                        z1 = z0 + self.voxel_size[2]
-                        
-                        # 8 vertices du cube
-                        cube_verts = [
-                            (x0, y0, z0), (x1, y0, z0), (x1, y1, z0), (x0, y1, z0),  # Base
-                            (x0, y0, z1), (x1, y0, z1), (x1, y1, z1), (x0, y1, z1),  # Haut
-                        ]
-                        vertices.extend(cube_verts)
-                        
-                        # 12 triangles (6 faces * 2 triangles)
-                        base = vertex_count
-                        cube_faces = [
-                            # Face avant
-                            (base+0, base+1, base+2), (base+0, base+2, base+3),
-                            # Face arrière
-                            (base+4, base+6, base+5), (base+4, base+7, base+6),
-                            # Face gauche
-                            (base+0, base+4, base+5), (base+0, base+5, base+1),
-                            # Face droite
-                            (base+2, base+6, base+7), (base+2, base+7, base+3),
-                            # Face bas
-                            (base+0, base+3, base+7), (base+0, base+7, base+4),
-                            # Face haut
-                            (base+1, base+5, base+6), (base+1, base+6, base+2),
-                        ]
-                        faces.extend(cube_faces)
-                        vertex_count += 8
-        
-        # Écrire fichier STL ASCII
-        with open(output_path, 'w') as f:
-            f.write("solid OptimizedPart\n")
-            
-            for face in faces:
-                v0 = vertices[face[0]]
-                v1 = vertices[face[1]]
-                v2 = vertices[face[2]]
-                
-                # Calculer normale (approximation)
-                normal = (0, 0, 1)  # Simplifié
-                
-                f.write(f"  facet normal {normal[0]} {normal[1]} {normal[2]}\n")
-                f.write("    outer loop\n")
-                f.write(f"      vertex {v0[0]} {v0[1]} {v0[2]}\n")
-                f.write(f"      vertex {v1[0]} {v1[1]} {v1[2]}\n")
-                f.write(f"      vertex {v2[0]} {v2[1]} {v2[2]}\n")
-                f.write("    endloop\n")
-                f.write("  endfacet\n")
-            
-            f.write("endsolid OptimizedPart\n")
-        
-        print(f"✅ STL simple généré: {output_path}")
-    
     def calculate_metrics(self, threshold: float = 0.5):
         """
         Calcule les métriques de la pièce optimisée
@@ -0,0 +1,220 @@
+"""
+Instrumentation légère: durées par phase, logs structurés (JSON) et
+métriques au format texte Prometheus (exposées par GET /metrics)
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("app.telemetry")
+
+# Bornes des histogrammes de durée (secondes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class PhaseTimer:
+    """
+    Cumule la durée et le nombre de passages de chaque phase
+
+        timer = PhaseTimer()
+        with timer.phase("fea"):
+            ...
+        timer.as_dict()  # {"fea": {"seconds": 0.012, "count": 1}}
+    """
+
+    def __init__(self):
+        self._phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float, count: int = 1):
+        total, passes = self._phases.get(name, (0.0, 0))
+        self._phases[name] = (total + seconds, passes + count)
+
+    def update(self, phases: dict):
+        """Ajoute les phases d'un autre as_dict() (ex: sous-étape du pipeline)"""
+        for name, entry in phases.items():
+            self.add(name, entry["seconds"], entry["count"])
+
+    def as_dict(self) -> dict:
+        return {
+            name: {"seconds": round(total, 4), "count": passes}
+            for name, (total, passes) in self._phases.items()
+        }
+
+
+def log_event(event: str, **fields):
+    """Une ligne JSON par événement (agrégeable par les outils de logs)"""
+    logger.info(json.dumps({"event": event, **fields}, default=str, separators=(",", ":")))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in sorted(labels.items())
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_sample(value: float) -> str:
+    # Compteurs entiers sans ".0" (plus lisibles, même valeur pour Prometheus)
+    value = float(value)
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return _format_value(value)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """Lignes (nom, labels, valeur) de la métrique"""
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_sample(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Compteur monotone, par combinaison de labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Histogramme cumulatif (buckets, _sum, _count), par combinaison de labels"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            series = [(dict(key), list(counts), total) for key, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class CallbackMetric(_Metric):
+    """
+    Valeur lue au moment du scrape (profondeur de file, compteurs d'un cache...)
+    callback() retourne un nombre, None (métrique omise) ou une liste de (labels, valeur)
+    """
+
+    def __init__(self, name: str, documentation: str, callback, type: str = "gauge"):
+        super().__init__(name, documentation)
+        self.type = type
+        self._callback = callback
+
+    def samples(self):
+        value = self._callback()
+        if value is None:
+            return []
+        if isinstance(value, (int, float)):
+            return [(self.name, {}, value)]
+        return [(self.name, labels, v) for labels, v in value if v is not None]
+
+
+class MetricsRegistry:
+    """Métriques du processus API, rendues au format texte Prometheus 0.0.4"""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Idempotent: un module réimporté retrouve la même métrique
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, callback) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, "gauge"))
+
+    def counter_callback(self, name: str, documentation: str, callback) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, "counter"))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # Une source indisponible ne doit pas casser tout le scrape
+                logger.warning(f"Métrique {metric.name} ignorée: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# Registre partagé du processus API
+metrics_registry = MetricsRegistry()
+
+http_requests = metrics_registry.counter(
+    "http_requests_total", "Requêtes HTTP traitées, par route et statut"
+)
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds", "Latence des requêtes HTTP (jusqu'au début de la réponse)"
+)
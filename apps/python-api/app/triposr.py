@@ -0,0 +1,176 @@
+"""
+Registre du modèle TripoSR (image -> 3D)
+Le modèle est chargé une seule fois par processus (au démarrage de l'API ou à
+la première requête) puis réutilisé; les inférences sont sérialisées par un
+verrou et les requêtes simultanées regroupées en lots (inference_batcher)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from app.inference_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+# Fichiers du modèle (dépôt Hugging Face ou dossier local TRIPOSR_MODEL)
+MODEL_CONFIG = "config.yaml"
+MODEL_WEIGHTS = "model.ckpt"
+
+
+class ModelUnavailableError(Exception):
+    """TripoSR (ou torch) n'est pas installé sur ce backend"""
+
+
+class TripoSRRegistry:
+    """
+    Modèle TripoSR partagé par toutes les requêtes /api/generate-3d
+
+    status: "not_loaded", "loading", "ready", "unavailable" (dépendances
+    absentes) ou "failed" (erreur de chargement, voir error)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "stabilityai/TripoSR",
+        cache_dir: str = ".cache/triposr",
+        device: str = "cpu",
+        chunk_size: int = 8192,
+        mc_resolution: int = 256,
+    ):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.device = device
+        self.chunk_size = chunk_size
+        self.mc_resolution = mc_resolution
+        self.status = "not_loaded"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._model = None
+        self._torch = None
+        self._load_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def _model_path(self) -> str:
+        """
+        Dossier local contenant config et poids
+        TSR.from_pretrained n'a pas de cache_dir: les fichiers d'un dépôt du Hub
+        sont téléchargés ici dans cache_dir, puis chargés depuis le disque
+        """
+        if os.path.isdir(self.model_name):
+            return self.model_name
+        from huggingface_hub import hf_hub_download
+
+        for filename in (MODEL_CONFIG, MODEL_WEIGHTS):
+            path = hf_hub_download(repo_id=self.model_name, filename=filename, cache_dir=self.cache_dir)
+        # Même révision du dépôt: les deux fichiers sont dans le même dossier
+        return os.path.dirname(path)
+
+    def load(self, warmup: bool = False):
+        """
+        Charge le modèle (idempotent, sûr entre threads)
+        Lève ModelUnavailableError si TripoSR n'est pas installé
+        """
+        with self._load_lock:
+            if self._model is not None:
+                return self._model
+            if self.status == "unavailable":
+                raise ModelUnavailableError(self.error)
+            self.status = "loading"
+            start = time.perf_counter()
+            try:
+                import torch
+                from tsr.system import TSR
+            except ImportError as e:
+                self.status = "unavailable"
+                self.error = f"TripoSR not installed ({e})"
+                raise ModelUnavailableError(self.error)
+
+            try:
+                logger.info(f"⏳ Loading TripoSR model on {self.device}...")
+                model = TSR.from_pretrained(
+                    self._model_path(),
+                    config_name=MODEL_CONFIG,
+                    weight_name=MODEL_WEIGHTS,
+                )
+                model.renderer.set_chunk_size(self.chunk_size)
+                model.to(self.device)
+                model.eval()
+            except Exception as e:
+                self.status = "failed"
+                self.error = str(e)
+                raise
+
+            self._torch = torch
+            self._model = model
+            self.load_seconds = round(time.perf_counter() - start, 2)
+            self.status = "ready"
+            self.error = None
+            logger.info(f"✓ TripoSR loaded in {self.load_seconds}s")
+
+        if warmup:
+            self.warmup()
+        return self._model
+
+    def warmup(self):
+        """Inférence sur une image factice (initialise les noyaux et allocations)"""
+        from PIL import Image
+
+        start = time.perf_counter()
+        self.infer(Image.new("RGB", (512, 512), (127, 127, 127)), extract_mesh=False)
+        self.warmup_seconds = round(time.perf_counter() - start, 2)
+        logger.info(f"✓ TripoSR warmup in {self.warmup_seconds}s")
+
+    def infer(self, image, extract_mesh: bool = True):
+        """
+        Image prétraitée (PIL RGB) -> maillage trimesh (ou scene codes)
+        Appel bloquant: à exécuter hors de l'event loop
+        """
+        if not extract_mesh:
+            model = self.load()
+            with self._inference_lock, self._torch.no_grad():
+                return model([image], device=self.device)
+        return self.infer_batch([image])[0]
+
+    def infer_batch(self, images: list) -> list:
+        """Lot d'images -> un maillage par image, en un seul passage du modèle"""
+        model = self.load()
+        with self._inference_lock, self._torch.no_grad():
+            scene_codes = model(images, device=self.device)
+            # Couleurs par sommet, comme la démo TripoSR (export GLB coloré)
+            return model.extract_mesh(scene_codes, has_vertex_color=True, resolution=self.mc_resolution)
+
+    def describe(self) -> dict:
+        return {
+            "model": self.model_name,
+            "device": self.device,
+            "status": self.status,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+
+# Instances partagées (configurées par variables d'environnement)
+model_registry = TripoSRRegistry(
+    model_name=os.getenv("TRIPOSR_MODEL", "stabilityai/TripoSR"),
+    cache_dir=os.getenv("TRIPOSR_CACHE_DIR", ".cache/triposr"),
+    device="cuda" if os.environ.get("USE_CUDA", "false").lower() == "true" else "cpu",
+    chunk_size=int(os.getenv("TRIPOSR_CHUNK_SIZE", "8192")),
+    mc_resolution=int(os.getenv("TRIPOSR_MC_RESOLUTION", "256")),
+)
+
+# Regroupe les requêtes simultanées en lots (taille bornée par la mémoire disponible)
+inference_batcher = MicroBatcher(
+    model_registry.infer_batch,
+    max_batch_size=int(os.getenv("TRIPOSR_BATCH_SIZE", "4")),
+    max_wait=float(os.getenv("TRIPOSR_BATCH_WAIT_MS", "50")) / 1000,
+    name="triposr-batcher",
+)
@@ -0,0 +1,216 @@
+"""
+Extraction de maillage surfacique depuis une grille de voxels
+Retourne des tableaux (vertices (n, 3) en mm, faces (m, 3) indices) directement
+exploitables par les exporteurs, sans opération booléenne B-rep
+"""
+from importlib.util import find_spec
+
+import numpy as np
+
+
+# Coins d'une face carrée dans le plan (b, c) orthogonal à l'axe a, avec
+# (a, b, c) permutation circulaire: ordre trigonométrique vu depuis +a
+_QUAD_CORNERS = np.array([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+
+def has_marching_cubes() -> bool:
+    # Marching cubes optionnel (scikit-image), importé seulement à l'utilisation
+    return find_spec("skimage") is not None
+
+
+def boundary_faces(solid: np.ndarray):
+    """
+    Faces de voxels exposées (voisin vide ou hors grille), par décalage de tableaux
+
+    Returns:
+        Liste de (axis, sign, coords) où coords (k, 3) sont les indices des
+        voxels dont la face de normale sign·e_axis est exposée
+    """
+    padded = np.pad(solid, 1, constant_values=False)
+    inner = (slice(1, -1),) * 3
+    exposed = []
+    for axis in range(3):
+        for sign in (1, -1):
+            neighbour = np.roll(padded, -sign, axis=axis)[inner]
+            coords = np.argwhere(solid & ~neighbour)
+            exposed.append((axis, sign, coords))
+    return exposed
+
+
+def _quads_to_mesh(quads: np.ndarray, lattice_shape: tuple, scale: np.ndarray):
+    """
+    Quadrilatères (k, 4, 3) en indices de sommets du réseau -> (vertices, faces)
+    Les sommets partagés sont dédupliqués via leur indice linéaire dans le réseau
+    """
+    # Deux triangles par quadrilatère, même orientation que le quad
+    return _polygons_to_mesh(
+        np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]]), lattice_shape, scale
+    )
+
+
+def _polygons_to_mesh(polygons: np.ndarray, lattice_shape: tuple, scale: np.ndarray):
+    """Polygones (k, m, 3) en indices du réseau -> (vertices, faces (k, m))"""
+    if len(polygons) == 0:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+    linear = np.ravel_multi_index(polygons.reshape(-1, 3).T, lattice_shape)
+    unique, inverse = np.unique(linear, return_inverse=True)
+    vertices = np.stack(np.unravel_index(unique, lattice_shape), axis=1) * scale
+    return vertices, inverse.reshape(len(polygons), -1)
+
+
+def _conforming_triangles(quads: np.ndarray, lattice_shape: tuple) -> np.ndarray:
+    """
+    Triangulation sans jonction en T de rectangles (k, 4, 3) du réseau
+
+    Un coin de rectangle situé à l'intérieur du bord d'un autre rectangle
+    devient un sommet de ce bord: le rectangle est alors triangulé en éventail
+    depuis son centre, les autres gardent leurs deux triangles. Les triangles
+    (t, 3, 3) sont en coordonnées doublées (centres des rectangles entiers).
+    """
+    # Bord e du rectangle q: du coin e au coin e+1 (indice 4q + e)
+    starts = quads.reshape(-1, 3)
+    ends = np.roll(quads, -1, axis=1).reshape(-1, 3)
+    lengths = np.abs(ends - starts).sum(axis=1)
+    steps = (ends - starts) // np.maximum(lengths, 1)[:, None]
+
+    # Points du réseau intérieurs aux bords, gardés s'ils sont coins d'un rectangle
+    inner = np.maximum(lengths - 1, 0)
+    edge = np.repeat(np.arange(len(starts)), inner)
+    t = np.arange(len(edge)) - np.repeat(np.cumsum(inner) - inner, inner) + 1
+    points = starts[edge] + t[:, None] * steps[edge]
+    corners = np.unique(np.ravel_multi_index(starts.T, lattice_shape))
+    junction = np.isin(np.ravel_multi_index(points.T, lattice_shape), corners)
+    edge, t, points = edge[junction], t[junction], points[junction]
+
+    split = np.zeros(len(quads), dtype=bool)
+    split[edge // 4] = True
+    plain = 2 * quads[~split]
+    triangles = [plain[:, [0, 1, 2]], plain[:, [0, 2, 3]]]
+    if split.any():
+        # Contour de chaque rectangle découpé: coins et jonctions dans l'ordre du quad
+        corner_edge = (4 * np.flatnonzero(split)[:, None] + np.arange(4)).ravel()
+        edge = np.concatenate([corner_edge, edge])
+        t = np.concatenate([np.zeros(len(corner_edge), dtype=t.dtype), t])
+        points = np.concatenate([starts[corner_edge], points])
+        order = np.lexsort((t, edge))
+        edge, points = edge[order], points[order]
+        owner = edge // 4
+        first = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        following = np.arange(1, len(owner) + 1)
+        following[np.r_[first[1:], len(owner)] - 1] = first
+        center = quads[owner, 0] + quads[owner, 2]
+        triangles.append(np.stack([center, 2 * points, 2 * points[following]], axis=1))
+    return np.concatenate(triangles)
+
+
+def voxel_surface_mesh(solid: np.ndarray, voxel_size: tuple):
+    """
+    Maillage fermé des faces extérieures des voxels solides (normales sortantes)
+
+    Args:
+        solid: grille booléenne (nx, ny, nz)
+        voxel_size: taille d'un voxel par axe (mm)
+    """
+    quads = []
+    for axis, sign, coords in boundary_faces(solid):
+        b, c = (axis + 1) % 3, (axis + 2) % 3
+        corners = _QUAD_CORNERS if sign > 0 else _QUAD_CORNERS[::-1]
+        quad = np.repeat(coords[:, None, :], 4, axis=1)
+        if sign > 0:
+            quad[:, :, axis] += 1
+        quad[:, :, b] += corners[:, 0]
+        quad[:, :, c] += corners[:, 1]
+        quads.append(quad)
+    lattice_shape = tuple(n + 1 for n in solid.shape)
+    return _quads_to_mesh(np.concatenate(quads), lattice_shape, np.asarray(voxel_size))
+
+
+def _merge_rectangles(layer: np.ndarray, b: np.ndarray, c: np.ndarray):
+    """
+    Fusion de cellules (layer, b, c) coplanaires en rectangles
+
+    1. Segments maximaux le long de c dans chaque ligne (layer, b)
+    2. Segments identiques (mêmes c0, c1) sur des lignes b consécutives fusionnés
+
+    Returns:
+        (layer, b0, b1, c0, c1) par rectangle, bornes hautes exclusives
+    """
+    # Tri par ligne puis c: un segment commence quand la continuité est rompue
+    order = np.lexsort((c, b, layer))
+    layer, b, c = layer[order], b[order], c[order]
+    new_run = np.ones(len(c), dtype=bool)
+    new_run[1:] = (layer[1:] != layer[:-1]) | (b[1:] != b[:-1]) | (c[1:] != c[:-1] + 1)
+    starts = np.flatnonzero(new_run)
+    ends = np.append(starts[1:], len(c)) - 1
+    run_layer, run_b, c0, c1 = layer[starts], b[starts], c[starts], c[ends] + 1
+
+    # Empilement des segments identiques sur des lignes consécutives
+    order = np.lexsort((run_b, c1, c0, run_layer))
+    run_layer, run_b, c0, c1 = run_layer[order], run_b[order], c0[order], c1[order]
+    new_rect = np.ones(len(run_b), dtype=bool)
+    new_rect[1:] = (
+        (run_layer[1:] != run_layer[:-1]) | (c0[1:] != c0[:-1])
+        | (c1[1:] != c1[:-1]) | (run_b[1:] != run_b[:-1] + 1)
+    )
+    starts = np.flatnonzero(new_rect)
+    ends = np.append(starts[1:], len(run_b)) - 1
+    return run_layer[starts], run_b[starts], run_b[ends] + 1, c0[starts], c1[starts]
+
+
+def greedy_surface_mesh(solid: np.ndarray, voxel_size: tuple):
+    """
+    Maillage des faces extérieures avec fusion des faces coplanaires adjacentes
+    en rectangles (greedy meshing): 2 triangles par rectangle au lieu de 2 par
+    face de voxel. Les sommets sont partagés et les bords des rectangles
+    découpés aux jonctions en T (maillage conforme, étanche pour l'impression).
+    """
+    quads = []
+    for axis, sign, coords in boundary_faces(solid):
+        if len(coords) == 0:
+            continue
+        b, c = (axis + 1) % 3, (axis + 2) % 3
+        layer, b0, b1, c0, c1 = _merge_rectangles(coords[:, axis], coords[:, b], coords[:, c])
+        plane = layer + (1 if sign > 0 else 0)
+        corners = [(b0, c0), (b1, c0), (b1, c1), (b0, c1)]
+        if sign < 0:
+            corners = corners[::-1]
+        quad = np.empty((len(layer), 4, 3), dtype=np.int64)
+        quad[:, :, axis] = plane[:, None]
+        for n, (cb, cc) in enumerate(corners):
+            quad[:, n, b] = cb
+            quad[:, n, c] = cc
+        quads.append(quad)
+    if not quads:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+    lattice_shape = tuple(n + 1 for n in solid.shape)
+    triangles = _conforming_triangles(np.concatenate(quads), lattice_shape)
+    # Réseau doublé: sommets aux nœuds et aux centres des rectangles
+    return _polygons_to_mesh(
+        triangles, tuple(2 * n - 1 for n in lattice_shape), np.asarray(voxel_size) / 2
+    )
+
+
+def isosurface_mesh(density: np.ndarray, threshold: float, voxel_size: tuple):
+    """
+    Isosurface lisse à density == threshold (marching cubes, scikit-image)
+    La grille est bordée de zéros pour fermer la surface aux limites du domaine
+    """
+    try:
+        from skimage.measure import marching_cubes
+    except ImportError:
+        raise ImportError("scikit-image non installé (marching cubes indisponible)")
+    padded = np.pad(density, 1, constant_values=0.0)
+    if padded.max() < threshold:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+    vertices, faces, _, _ = marching_cubes(padded, level=threshold, spacing=voxel_size)
+    # Densités aux centres des voxels: décalage de la bordure et du demi-voxel
+    vertices -= np.asarray(voxel_size) / 2
+    return vertices, faces.astype(np.int64)
+
+
+def triangle_normals(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """Normales unitaires des triangles (règle de la main droite)"""
+    tri = vertices[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
@@ -0,0 +1,352 @@
+"""
+Benchmarks du pipeline SIMP -> STL et de l'API
+
+Usage (depuis apps/python-api):
+    python benchmarks/run_benchmarks.py                      # Toute la suite
+    python benchmarks/run_benchmarks.py --quick -k simp      # Sous-ensemble rapide
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.2
+
+Chaque benchmark rapporte p50/p95/moyenne (secondes), débit (opérations/s),
+pic d'allocation (tracemalloc, passe séparée) et pic RSS du processus.
+Avec --baseline, toute hausse du p50 au-delà de --threshold est signalée
+comme régression (code de sortie 1). La baseline n'est pas versionnée (durées
+propres à la machine): l'enregistrer avec --save-baseline sur la branche de
+référence, puis comparer la branche modifiée sur la même machine.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.simp_optimizer import SIMPOptimizer  # noqa: E402
+from app.stl_generator import STLGenerator  # noqa: E402
+from app.voxel_mesh import has_marching_cubes  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DIMENSIONS = (100.0, 100.0, 100.0)
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus (Mo), None si indisponible"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: Ko, macOS: octets
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values, q: float) -> float:
+    return float(np.percentile(values, q))
+
+
+def summarize(name: str, timings: list, peak_alloc: float = None, ops: int = 1, extra: dict = None) -> dict:
+    mean = float(np.mean(timings))
+    result = {
+        "name": name,
+        "runs": len(timings),
+        "p50": round(percentile(timings, 50), 6),
+        "p95": round(percentile(timings, 95), 6),
+        "mean": round(mean, 6),
+        "throughput": round(ops / mean, 3) if mean > 0 else None,
+        "peak_alloc_mb": peak_alloc,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if extra:
+        result.update(extra)
+    return result
+
+
+def measure(name: str, fn, repeat: int, warmup: int = 1, setup=None, extra: dict = None) -> dict:
+    """
+    Chronomètre fn(state) sur repeat exécutions (après warmup), setup() fournit
+    un état neuf à chaque exécution (hors chronométrage)
+    """
+    setup = setup or (lambda: None)
+    for _ in range(warmup):
+        fn(setup())
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        fn(state)
+        timings.append(time.perf_counter() - start)
+
+    # Pic d'allocation mesuré sur une passe séparée (tracemalloc ralentit l'exécution)
+    state = setup()
+    tracemalloc.start()
+    fn(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(name, timings, round(peak / 1024 / 1024, 2), extra=extra)
+
+
+@contextlib.contextmanager
+def quiet():
+    # Le pipeline trace sa progression avec print: hors mesure
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def make_optimizer(resolution: int, solver: str = "fast") -> SIMPOptimizer:
+    optimizer = SIMPOptimizer(
+        dimensions=DIMENSIONS, resolution=resolution, volume_fraction=0.4, solver=solver
+    )
+    optimizer.apply_loads_and_constraints(
+        force_magnitude=1000.0, force_direction=[0, 0, -1], fixed_faces=["bottom"]
+    )
+    return optimizer
+
+
+def optimized_density(resolution: int, iterations: int = 30) -> np.ndarray:
+    with quiet():
+        density, _ = make_optimizer(resolution).optimize(iterations=iterations)
+    return density
+
+
+# --- Benchmarks -------------------------------------------------------------
+
+def bench_simp(quick: bool, solvers: list):
+    for solver in solvers:
+        # Solveurs FE: grilles plus petites (une résolution linéaire par itération)
+        if solver == "fast":
+            resolutions = (10, 20, 30) if quick else (10, 20, 30, 40, 60)
+        else:
+            resolutions = (10, 16) if quick else (10, 20, 30)
+        iterations = 20 if quick else 50
+        for resolution in resolutions:
+            repeat = 2 if resolution >= 30 or quick else 5
+
+            def run(optimizer):
+                with quiet():
+                    optimizer.optimize(iterations=iterations)
+
+            yield measure(
+                f"simp_optimize_{solver}_res{resolution}",
+                run,
+                repeat=repeat,
+                warmup=0,
+                setup=lambda: make_optimizer(resolution, solver),
+                extra={"iterations": iterations, "voxels": resolution ** 3},
+            )
+
+
+def bench_kernels(quick: bool):
+    resolution = 30 if quick else 40
+    repeat = 20 if quick else 50
+    optimizer = make_optimizer(resolution)
+    optimizer.density = optimized_density(resolution)
+
+    yield measure(
+        f"simplified_fea_res{resolution}",
+        lambda _: optimizer._simplified_fea(),
+        repeat=repeat,
+        extra={"voxels": resolution ** 3},
+    )
+
+    _, sensitivity = optimizer._simplified_fea()
+    yield measure(
+        f"filter_sensitivity_res{resolution}",
+        lambda _: optimizer._filter_sensitivity(sensitivity),
+        repeat=repeat,
+        extra={"voxels": resolution ** 3},
+    )
+
+    yield measure(
+        f"update_density_res{resolution}",
+        lambda _: optimizer._update_density(sensitivity),
+        repeat=repeat,
+        extra={"voxels": resolution ** 3},
+    )
+
+
+def bench_export(quick: bool, workdir: Path):
+    resolution = 30 if quick else 40
+    generator = STLGenerator(optimized_density(resolution), DIMENSIONS)
+    methods = ["surface", "greedy"] + (["marching_cubes"] if has_marching_cubes() else [])
+    formats = ("stl",) if quick else ("stl", "3mf", "obj", "ply")
+    for method in methods:
+        for file_format in formats:
+            path = workdir / f"bench_{method}.{file_format}"
+
+            def run(_):
+                with quiet():
+                    generator.generate_stl(0.5, str(path), method=method, file_format=file_format)
+
+            result = measure(
+                f"export_{method}_{file_format}_res{resolution}", run, repeat=5 if quick else 10
+            )
+            result["file_bytes"] = path.stat().st_size
+            yield result
+
+
+def bench_api(quick: bool, concurrency: int):
+    try:
+        import httpx
+    except ImportError:
+        print("⚠️ httpx non installé - benchmark API ignoré (pip install httpx)")
+        return
+
+    # Calcul réel à chaque requête: pas de cache de résultats ni de TripoSR
+    os.environ["RESULT_CACHE_MAX_MB"] = "0"
+    os.environ.setdefault("ENABLED_ROUTERS", "optimization")
+    with quiet():
+        import main
+
+    payload = json.loads((ROOT / "test_request.json").read_text())
+    # Nombre d'itérations fixe: sans arrêt anticipé, la charge ne dépend pas de la convergence
+    payload["optimization"].update(
+        resolution=20, iterations=20, density_encoding="none",
+        max_density_change=None, compliance_tol=None, time_budget=None,
+    )
+    requests_per_caller = 2 if quick else 5
+
+    async def caller(client, latencies):
+        for _ in range(requests_per_caller):
+            start = time.perf_counter()
+            response = await client.post("/api/optimize", json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async def run():
+        latencies = []
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+                # Premier appel hors mesure (démarrage du pool de processus)
+                await client.post("/api/optimize", json=payload)
+                start = time.perf_counter()
+                await asyncio.gather(*(caller(client, latencies) for _ in range(concurrency)))
+                wall = time.perf_counter() - start
+        return latencies, wall
+
+    with quiet():
+        latencies, wall = asyncio.run(run())
+    result = summarize(
+        f"api_optimize_c{concurrency}",
+        latencies,
+        extra={"concurrency": concurrency, "requests": len(latencies)},
+    )
+    # Débit global: requêtes terminées par seconde avec appelants concurrents
+    result["throughput"] = round(len(latencies) / wall, 3)
+    yield result
+
+
+SUITES = ("simp", "kernels", "export", "api")
+
+
+# --- Baselines --------------------------------------------------------------
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Benchmarks dont le p50 dépasse celui de la baseline de plus de threshold"""
+    previous = {entry["name"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        reference = previous.get(result["name"])
+        if reference is None or not reference["p50"]:
+            continue
+        ratio = result["p50"] / reference["p50"]
+        result["baseline_p50"] = reference["p50"]
+        result["change"] = round(ratio - 1, 4)
+        if ratio > 1 + threshold:
+            regressions.append(result)
+    return regressions
+
+
+def print_result(result: dict):
+    change = ""
+    if "change" in result:
+        change = f"  {result['change']:+.1%} vs baseline"
+    alloc = f"{result['peak_alloc_mb']:.1f} Mo" if result.get("peak_alloc_mb") is not None else "-"
+    print(
+        f"  {result['name']:<36} p50={result['p50'] * 1000:9.2f} ms  "
+        f"p95={result['p95'] * 1000:9.2f} ms  {result['throughput']:9.2f} op/s  "
+        f"alloc={alloc:>9}{change}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks SIMP -> STL et API")
+    parser.add_argument("-k", "--suite", action="append", choices=SUITES,
+                        help="Suite(s) à exécuter (défaut: toutes)")
+    parser.add_argument("--quick", action="store_true", help="Tailles et répétitions réduites")
+    parser.add_argument("--solver", action="append", choices=("fast", "sparse", "matrix_free"),
+                        help="Solveur(s) du benchmark SIMP (défaut: fast)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Appelants simultanés (API)")
+    parser.add_argument("--output", type=Path, help="Écrit les résultats JSON dans ce fichier")
+    parser.add_argument("--save-baseline", type=Path, help="Enregistre les résultats comme baseline")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Hausse relative du p50 signalée comme régression (défaut: 0.2)")
+    args = parser.parse_args()
+
+    suites = args.suite or list(SUITES)
+    workdir = Path(os.getenv("BENCH_DIR", ROOT / ".bench"))
+    workdir.mkdir(exist_ok=True)
+
+    print(f"⏱️ Benchmarks ({', '.join(suites)}){' - mode rapide' if args.quick else ''}")
+    results = []
+    generators = {
+        "simp": lambda: bench_simp(args.quick, args.solver or ["fast"]),
+        "kernels": lambda: bench_kernels(args.quick),
+        "export": lambda: bench_export(args.quick, workdir),
+        "api": lambda: bench_api(args.quick, args.concurrency),
+    }
+    for suite in suites:
+        print(f"\n[{suite}]")
+        for result in generators[suite]():
+            results.append(result)
+            print_result(result)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": args.quick,
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+            for result in regressions:
+                print_result(result)
+        else:
+            print(f"\n✅ Aucune régression au-delà de {args.threshold:.0%} (baseline {args.baseline})")
+        report["regressions"] = [result["name"] for result in regressions]
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2))
+            print(f"💾 Résultats enregistrés: {path}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,23 +2,97 @@
 Backend FastAPI pour Optimisation Topologique avec SIMP
 Déployé sur Railway - appelé par Next.js frontend
 """
-from fastapi import FastAPI
+import time
+
+_process_start = time.perf_counter()
+
+import asyncio
+import importlib
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 import os
 from dotenv import load_dotenv
 
 # Charger variables d'environnement (avant les imports qui pourraient en avoir besoin)
 load_dotenv()
 
-# Import des routers
-from app.routers import optimize, generate_3d
+# Logs applicatifs (dont les événements JSON de app.telemetry) sur la sortie standard
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
+
+from app.artifacts import artifact_store
+from app.jobs import job_manager
+from app.telemetry import http_request_duration, http_requests, metrics_registry
+
+# Groupes de routers activables par configuration (ENABLED_ROUTERS): un
+# déploiement "optimization" seul n'importe jamais PIL, rembg ni torch
+ROUTER_GROUPS = {
+    "optimization": ("app.routers.optimize", "optimization"),
+    "generate_3d": ("app.routers.generate_3d", "3d-generation"),
+}
+ENABLED_ROUTERS = [
+    group.strip()
+    for group in (os.getenv("ENABLED_ROUTERS") or ",".join(ROUTER_GROUPS)).split(",")
+    if group.strip() in ROUTER_GROUPS
+]
+
+# Temps de démarrage (secondes), exposé par GET /
+startup_report = {"routers": {}}
+
+metrics_registry.gauge_callback(
+    "process_startup_seconds", "Durée du démarrage de l'API (imports, routers)",
+    lambda: startup_report.get("ready_seconds"),
+)
+metrics_registry.gauge_callback(
+    "process_uptime_seconds", "Temps écoulé depuis le lancement du processus",
+    lambda: round(time.perf_counter() - _process_start, 3),
+)
+
+
+def _preload_model(warmup: bool):
+    from app.triposr import model_registry
+
+    try:
+        model_registry.load(warmup=warmup)
+    except Exception as e:
+        print(f"⚠️ TripoSR non chargé: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage / arrêt de l'application"""
+    # Balayage périodique des artefacts expirés (TTL) ou en excès (taille)
+    sweeper = asyncio.create_task(
+        artifact_store.run_sweeper(float(os.getenv("ARTIFACT_SWEEP_INTERVAL", "600")))
+    )
+    # Préchargement du modèle TripoSR en arrière-plan (/health répond pendant le chargement)
+    generate_3d = "generate_3d" in ENABLED_ROUTERS
+    if generate_3d and os.getenv("TRIPOSR_PRELOAD", "true").lower() == "true":
+        warmup = os.getenv("TRIPOSR_WARMUP", "false").lower() == "true"
+        asyncio.create_task(asyncio.to_thread(_preload_model, warmup))
+    startup_report["ready_seconds"] = round(time.perf_counter() - _process_start, 3)
+    print(f"⏱️ Démarrage en {startup_report['ready_seconds']}s (routers: {startup_report['routers']})")
+    yield
+    sweeper.cancel()
+    if generate_3d:
+        from app.triposr import inference_batcher
+        inference_batcher.shutdown()
+    # Arrêter le pool de processus des jobs d'optimisation
+    job_manager.shutdown()
+
 
 # Initialiser FastAPI
 app = FastAPI(
     title="Topology Optimization API",
     description="Backend SIMP pour génération de pièces optimisées",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configuration CORS pour Next.js
@@ -32,9 +106,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Routes
-app.include_router(optimize.router, prefix="/api", tags=["optimization"])
-app.include_router(generate_3d.router, prefix="/api", tags=["3d-generation"])
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latence et nombre de requêtes par route (gabarit de chemin, pas l'URL brute)"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        http_request_duration.observe(time.perf_counter() - start, method=request.method, route=path)
+        http_requests.inc(method=request.method, route=path, status=status)
+
+
+# Routes (import mesuré par groupe)
+for group in ENABLED_ROUTERS:
+    module_name, tag = ROUTER_GROUPS[group]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    app.include_router(module.router, prefix="/api", tags=[tag])
+    startup_report["routers"][group] = round(time.perf_counter() - start, 3)
+
+# Téléchargement des artefacts (STL, GLB, profils): commun à tous les groupes
+from app.routers import downloads
+
+app.include_router(downloads.router, prefix="/api", tags=["downloads"])
+startup_report["import_seconds"] = round(time.perf_counter() - _process_start, 3)
 
 
 @app.get("/")
@@ -44,9 +144,14 @@ async def root():
         "status": "online",
         "service": "Topology Optimization API",
         "version": "1.0.0",
+        "routers": ENABLED_ROUTERS,
+        "startup": startup_report,
         "endpoints": {
             "optimize": "/api/optimize (POST)",
-            "download_stl": "/api/download/{filename} (GET)"
+            "optimize_jobs": "/api/optimize/jobs (POST), /api/optimize/jobs/{job_id} (GET, DELETE)",
+            "optimize_cache": "/api/optimize/cache (GET)",
+            "download": "/api/download/{artifact_id}/{filename} (GET)",
+            "metrics": "/metrics (GET)"
         }
     }
 
@@ -57,6 +162,32 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Métriques au format texte Prometheus (latences, files, caches, modèle)"""
+    return Response(metrics_registry.render(), media_type=metrics_registry.content_type)
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 quand le modèle TripoSR est chargé, 503 sinon
+    (chargement en cours, dépendances absentes ou erreur); toujours 200 si
+    le groupe generate_3d est désactivé
+    """
+    if "generate_3d" not in ENABLED_ROUTERS:
+        return {"ready": True, "triposr": None}
+
+    from app.triposr import inference_batcher, model_registry
+
+    body = {
+        "ready": model_registry.ready,
+        "triposr": model_registry.describe(),
+        "batching": inference_batcher.stats(),
+    }
+    return JSONResponse(body, status_code=200 if model_registry.ready else 503)
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
@@ -0,0 +1,10 @@
+"""
+Rend le package app importable quel que soit le dossier de lancement de pytest
+(pytest tests, python -m pytest, pytest apps/python-api/tests depuis la racine)
+"""
+import sys
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
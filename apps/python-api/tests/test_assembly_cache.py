@@ -0,0 +1,34 @@
+"""
+Cache des structures d'assemblage du solveur "sparse" (préconditionneur multigrille)
+"""
+import numpy as np
+
+from app.fea_solver import SparseFESolver, coarse_patterns, fine_patterns
+from app.simp_optimizer import SIMPOptimizer
+
+
+def solve_once(resolution: int = 20):
+    optimizer = SIMPOptimizer(
+        dimensions=(100, 100, 100), resolution=resolution, solver="sparse", preconditioner="multigrid"
+    )
+    optimizer.apply_loads_and_constraints(1000, [0, 0, -1], ["bottom"])
+    solver = optimizer._fe_solver
+    stiffness = np.ones(int(np.prod(solver.model.shape)))
+    u, info = solver.solve(stiffness)
+    assert np.isfinite(u).all()
+    return solver
+
+
+def test_fine_pattern_survives_multigrid_levels():
+    fine_patterns.clear()
+    coarse_patterns.clear()
+
+    first = solve_once()
+    assert first._multigrid.levels > 2  # Niveaux grossiers assemblés eux aussi
+    assert (fine_patterns.hits, fine_patterns.misses) == (0, 1)
+
+    second = solve_once()
+    assert (fine_patterns.hits, fine_patterns.misses) == (1, 1)
+    assert coarse_patterns.hits == coarse_patterns.misses
+    assert second._indices is first._indices
+    assert isinstance(second, SparseFESolver)
@@ -0,0 +1,43 @@
+"""
+Continuation multi-résolution sur une pièce élancée (équerre 400×40×20 mm)
+"""
+import numpy as np
+import pytest
+
+from app.simp_optimizer import MIN_LEVEL_ELEMENTS, SIMPOptimizer
+
+
+def make_bracket(solver: str = "fast") -> SIMPOptimizer:
+    optimizer = SIMPOptimizer(
+        dimensions=(400, 40, 20), voxel_budget=15625, volume_fraction=0.4, solver=solver
+    )
+    optimizer.apply_loads_and_constraints(1000, [0, 0, -1], ["left"])
+    return optimizer
+
+
+@pytest.mark.parametrize("solver", ["fast", "sparse"])
+def test_slender_part_skips_too_coarse_levels(solver):
+    optimizer = make_bracket(solver)
+    fine_shape = (optimizer.nx, optimizer.ny, optimizer.nz)
+    assert fine_shape == (146, 15, 7)
+
+    density, metrics = optimizer.optimize_multilevel(
+        [(0.25, 3), (0.5, 3)], iterations=2, max_density_change=None
+    )
+
+    # ×0.25 donnerait 36x4x2: ignoré; ×0.5 (73x8x4) puis grille fine
+    shapes = [tuple(level["grid_shape"]) for level in metrics["levels"]]
+    assert shapes == [(73, 8, 4), fine_shape]
+    assert all(min(shape) >= MIN_LEVEL_ELEMENTS for shape in shapes)
+    assert density.shape == fine_shape
+    assert np.isfinite(density).all()
+    assert metrics["total_iterations"] == 5
+
+
+def test_load_zone_stays_inside_thin_grid():
+    optimizer = SIMPOptimizer(dimensions=(40, 6, 6), resolution=3)
+    optimizer.apply_loads_and_constraints(1000, [0, 0, -1], ["bottom"])
+
+    # Zone de chargement bornée à la grille (pas d'indices négatifs)
+    assert optimizer.load_nodes[:, :, -1].all()
+    assert not optimizer.load_nodes[:, :, :-1].any()